@@ -0,0 +1,66 @@
+"""Measures the cold import time of the pipeline modules
+
+Every module is imported in a fresh interpreter so that no import is served
+from the module cache of a previous measurement.
+
+    python bench_import_time.py [--runs 5] [modules ...]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "sources",
+    "fetch_github",
+    "run_pipeline",
+    "transcript",
+    "retrieve_html_to_text",
+]
+
+SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def measure(module: str, runs: int) -> list[float]:
+    """Import a module in fresh interpreters
+    @parameter module : str - Module name
+    @parameter runs : int - Number of interpreters to start
+    @returns list[float] - Import time of every run in seconds
+    """
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET.format(module=module)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1]
+            raise RuntimeError(f"Importing {module} failed: {error}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<24}{'median (ms)':>14}{'min (ms)':>12}")
+    for module in args.modules:
+        try:
+            timings = measure(module, args.runs)
+        except RuntimeError as e:
+            print(f"{module:<24}{str(e)}")
+            continue
+        print(
+            f"{module:<24}{statistics.median(timings) * 1000:>14.1f}"
+            f"{min(timings) * 1000:>12.1f}"
+        )
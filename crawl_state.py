@@ -0,0 +1,221 @@
+import hashlib
+import math
+import sqlite3
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str, keep_query: bool = False) -> str:
+    """Canonicalize a URL so that trivial variants map to the same crawl entry
+    @parameter url : str - The URL
+    @parameter keep_query : bool - Keep the (sorted) query string instead of dropping it
+    @returns str - The normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    # Drop ports that are implied by the scheme
+    if parts.port and DEFAULT_PORTS.get(scheme) != parts.port:
+        host = f"{host}:{parts.port}"
+
+    # Collapse duplicate slashes and remove the trailing slash (except for the root)
+    path = "/".join(segment for segment in parts.path.split("/") if segment)
+    path = "/" + path
+
+    query = ""
+    if keep_query and parts.query:
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    # Fragments never change the fetched page
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_fingerprint(url: str) -> int:
+    """Hash a URL to a signed 64-bit fingerprint
+    @parameter url : str - The (normalized) URL
+    @returns int - The fingerprint
+    """
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def url_depth(url: str) -> int:
+    """@returns int - Number of path components of a URL"""
+    return len([part for part in urlsplit(url).path.split("/") if part])
+
+
+class BloomFilter:
+    """Fixed-size bit array used as a compact, probabilistic membership test"""
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: int):
+        # Double hashing: derive k positions from the two halves of the fingerprint
+        value = fingerprint & 0xFFFFFFFFFFFFFFFF
+        h1 = value >> 32
+        h2 = (value & 0xFFFFFFFF) | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, fingerprint: int):
+        for position in self._positions(fingerprint):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(fingerprint)
+        )
+
+
+class CrawlState:
+    """Crawl frontier and visited set backed by SQLite
+
+    Every URL ever discovered is stored once on disk. Membership checks go
+    through an in-memory Bloom filter first and only hit SQLite when the
+    filter reports a possible match, so memory stays flat regardless of the
+    size of the crawl. Pending URLs stay in the database until they are
+    marked as done, so an interrupted crawl resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        path: str = "crawl_state.db",
+        capacity: int = 1_000_000,
+        error_rate: float = 0.001,
+    ):
+        """
+        @parameter path : str - SQLite database file (":memory:" for a throwaway state)
+        @parameter capacity : int - Expected number of URLs, used to size the Bloom filter
+        @parameter error_rate : float - Target false positive rate of the Bloom filter
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL DEFAULT 0,
+                visited INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS urls_frontier ON urls (visited, depth, id)"
+        )
+        self.connection.commit()
+
+        self.seen_filter = BloomFilter(capacity, error_rate)
+        for (url,) in self.connection.execute("SELECT url FROM urls"):
+            self.seen_filter.add(url_fingerprint(url))
+
+    def reset(self):
+        """Discard all queued and visited URLs to start a new crawl"""
+        self.connection.execute("DELETE FROM urls")
+        self.connection.commit()
+        self.seen_filter = BloomFilter(self.capacity, self.error_rate)
+
+    def begin(self, resume: bool = True) -> bool:
+        """Prepare the state for a crawl
+        A crawl whose frontier is exhausted has nothing left to resume, so it
+        starts over just like a crawl that is not resumed.
+        @parameter resume : bool - Continue an interrupted crawl instead of starting over
+        @returns bool - Whether a new crawl was started
+        """
+        if resume and self.pending() > 0:
+            return False
+        self.reset()
+        return True
+
+    def seen(self, url: str) -> bool:
+        """Check whether a URL was already queued or visited
+        @parameter url : str - The URL
+        @returns bool - Whether the URL is known
+        """
+        url = normalize_url(url)
+        if url_fingerprint(url) not in self.seen_filter:
+            return False
+        row = self.connection.execute(
+            "SELECT 1 FROM urls WHERE url = ?", (url,)
+        ).fetchone()
+        return row is not None
+
+    def push(self, url: str) -> bool:
+        """Add a URL to the frontier unless it is already known
+        @parameter url : str - The URL
+        @returns bool - Whether the URL was newly added
+        """
+        return self.push_many([url]) == 1
+
+    def push_many(self, urls) -> int:
+        """Add several URLs to the frontier in a single transaction
+        @parameter urls : Iterable[str] - The URLs
+        @returns int - Number of newly added URLs
+        """
+        added = 0
+        for url in urls:
+            if self.seen(url):
+                continue
+            url = normalize_url(url)
+            self.connection.execute(
+                "INSERT OR IGNORE INTO urls (url, depth) VALUES (?, ?)",
+                (url, url_depth(url)),
+            )
+            self.seen_filter.add(url_fingerprint(url))
+            added += 1
+        self.connection.commit()
+        return added
+
+    def pop(self) -> str | None:
+        """Return the shallowest (then oldest) pending URL without removing it from the frontier
+        Overview pages near the root are visited before deeply nested ones, so a
+        crawl cut short by a budget covers the most important pages.
+        @returns str | None - The next URL to visit, None if the frontier is empty
+        """
+        row = self.connection.execute(
+            "SELECT url FROM urls WHERE visited = 0 ORDER BY depth, id LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def done(self, url: str, failed: bool = False):
+        """Mark a URL as visited and remove it from the frontier
+        @parameter url : str - The URL
+        @parameter failed : bool - The page could not be fetched, see failed()
+        """
+        self.connection.execute(
+            "UPDATE urls SET visited = ? WHERE url = ?",
+            (2 if failed else 1, normalize_url(url)),
+        )
+        self.connection.commit()
+
+    def requeue(self, url: str):
+        """Put a visited URL back into the frontier, e.g. a page that was not imported
+        @parameter url : str - The URL
+        """
+        self.connection.execute(
+            "UPDATE urls SET visited = 0 WHERE url = ?", (normalize_url(url),)
+        )
+        self.connection.commit()
+
+    def failed(self) -> list[str]:
+        """@returns list[str] - URLs of the current crawl that were discovered but could not be fetched"""
+        return [
+            row[0]
+            for row in self.connection.execute("SELECT url FROM urls WHERE visited = 2")
+        ]
+
+    def pending(self) -> int:
+        """@returns int - Number of URLs waiting in the frontier"""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM urls WHERE visited = 0"
+        ).fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -1,31 +1,31 @@
 import requests
-import base64
 
 from dotenv import load_dotenv
 
 load_dotenv()
 import aiohttp
 
+from streaming import read_body
 
-def fetch_docs(owner, repo, folder_path, token=None) -> list:
-    """Fetch filenames from Github
+
+def fetch_tree(owner, repo, folder_path, token=None) -> list:
+    """Fetch the tree entries of documents from Github
     @parameter owner : str - Repo owner
     @parameter repo : str - Repo name
     @parameter folder_path : str - Directory in repo to fetch from
     @parameter token : str - Github token
-    @returns list - List of document names
+    @returns list - List of dicts with the path, blob sha and size of every document
     """
 
     url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/main?recursive=1"
-    headers = {
-        "Authorization": f"token {token}" if token else None,
-        "Accept": "application/vnd.github.v3+json",
-    }
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
     response = requests.get(url, headers=headers)
     response.raise_for_status()  # Raise an exception for HTTP errors
 
     md_files = [
-        item["path"]
+        {"path": item["path"], "sha": item.get("sha"), "size": item.get("size")}
         for item in response.json()["tree"]
         if item["path"].startswith(folder_path)
         and (
@@ -37,30 +37,49 @@ def fetch_docs(owner, repo, folder_path, token=None) -> list:
     return md_files
 
 
-async def download_file(owner, repo, file_path, token=None) -> str:
+def fetch_docs(owner, repo, folder_path, token=None) -> list:
+    """Fetch filenames from Github
+    @parameter owner : str - Repo owner
+    @parameter repo : str - Repo name
+    @parameter folder_path : str - Directory in repo to fetch from
+    @parameter token : str - Github token
+    @returns list - List of document names
+    """
+    return [entry["path"] for entry in fetch_tree(owner, repo, folder_path, token)]
+
+
+async def download_file(
+    owner, repo, file_path, token=None, session=None, max_bytes=None
+) -> str:
     """Download files from Github based on filename
     @parameter owner : str - Repo owner
     @parameter repo : str - Repo name
     @parameter file_path : str - Path of the file in repo
     @parameter token : str - Github token
+    @parameter session : aiohttp.ClientSession - Shared session, a new one is opened if None
+    @parameter max_bytes : int - Maximum file size, raises DocumentTooLarge for bigger files
     @returns str - Content of the file
     """
     url = f"https://api.github.com/repos/{owner}/{repo}/contents/{file_path}"
-    headers = {
-        "Authorization": f"token {token}" if token else None,
-        "Accept": "application/vnd.github.v3+json",
-    }
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=headers) as response:
-            response.raise_for_status()
-            response_json = await response.json()
-
-    content_b64 = response_json["content"]
-    link = response_json["html_url"]
-    path = response_json["path"]
-    content = base64.b64decode(content_b64).decode("utf-8")
-
-    return (content, link, path)
+    # The raw media type returns the file itself instead of base64 inside JSON,
+    # so it can be streamed and is decoded only once
+    headers = {"Accept": "application/vnd.github.v3.raw"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    if session is None:
+        async with aiohttp.ClientSession() as session:
+            return await download_file(
+                owner, repo, file_path, token, session, max_bytes
+            )
+
+    async with session.get(url, headers=headers) as response:
+        response.raise_for_status()
+        content = (await read_body(response, max_bytes)).decode("utf-8")
+
+    link = f"https://github.com/{owner}/{repo}/blob/main/{file_path}"
+
+    return (content, link, file_path)
 
 
 def is_link_working(url: str) -> bool:
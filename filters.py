@@ -0,0 +1,70 @@
+from collections import Counter
+
+from wasabi import msg  # type: ignore[import]
+
+# Filter stages in order of cost: decided from the URL/path alone, from the
+# size known before the body is downloaded (tree listing, Content-Length),
+# and from the fetched and converted content
+PATH = "path"
+SIZE = "size"
+CONTENT = "content"
+STAGES = (PATH, SIZE, CONTENT)
+
+
+class FilterPipeline:
+    """Named keep/reject rules grouped by the stage at which they can be decided
+
+    Sources run every stage as early as its input is available, so documents
+    are rejected before paying for a download or a conversion whenever the
+    cheaper information is enough. Rejections are counted per rule.
+    """
+
+    def __init__(self, name: str = ""):
+        """
+        @parameter name : str - Name used when reporting the rejection counts
+        """
+        self.name = name
+        self.rules = {stage: [] for stage in STAGES}
+        self.checked = Counter()
+        self.rejections = Counter()
+
+    def add(self, stage: str, name: str, rule) -> "FilterPipeline":
+        """Add a rule to a stage
+        @parameter stage : str - One of PATH, SIZE or CONTENT
+        @parameter name : str - Name of the rule in the rejection counts
+        @parameter rule : Callable - Returns True to keep the document
+        @returns FilterPipeline - The pipeline, to chain calls
+        """
+        if stage not in self.rules:
+            raise ValueError(f"Unknown filter stage {stage}, available: {', '.join(STAGES)}")
+        self.rules[stage].append((name, rule))
+        return self
+
+    def accept(self, stage: str, value) -> bool:
+        """Run the rules of a stage, stopping at the first rejection
+        @parameter stage : str - One of PATH, SIZE or CONTENT
+        @parameter value : Any - Path/URL, size in bytes or content, depending on the stage
+        @returns bool - Whether the document passed all rules of the stage
+        """
+        # The size is not always known up front, leave the decision to the content rules
+        if stage == SIZE and value is None:
+            return True
+
+        self.checked[stage] += 1
+        for name, rule in self.rules[stage]:
+            if not rule(value):
+                self.rejections[name] += 1
+                return False
+        return True
+
+    def report(self):
+        """Log how many documents every stage checked and every rule rejected"""
+        checked = ", ".join(
+            f"{self.checked[stage]} by {stage}" for stage in STAGES if self.checked[stage]
+        )
+        msg.info(f"{self.name} filters checked {checked or 'no documents'}")
+        if not self.rejections:
+            msg.info(f"{self.name} filters rejected no documents")
+            return
+        counts = ", ".join(f"{name}: {count}" for name, count in self.rejections.items())
+        msg.info(f"{self.name} filters rejected {sum(self.rejections.values())} documents ({counts})")
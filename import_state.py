@@ -0,0 +1,186 @@
+import hashlib
+import json
+import sqlite3
+
+
+def content_fingerprint(content: str) -> str:
+    """Hash the cleaned content of a document
+    @parameter content : str - Document text
+    @returns str - Hex digest identifying the content
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ImportState:
+    """Record of the documents imported into Verba, keyed by their source URL
+
+    Used to reconcile a source with what was imported previously: unchanged
+    documents are skipped, changed ones re-imported and documents that were
+    not seen again during a full pass are reported as removed.
+    """
+
+    def __init__(self, path: str = "import_state.db"):
+        """
+        @parameter path : str - SQLite database file (":memory:" for a throwaway state)
+        """
+        # Shards running in separate processes write to the same file
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                source TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                seen INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self.connection.commit()
+
+    def start_pass(self):
+        """Forget which documents were seen, call before a fresh full pass over a source"""
+        self.connection.execute("UPDATE documents SET seen = 0")
+        self.connection.commit()
+
+    def fingerprint(self, source: str) -> str | None:
+        """@returns str | None - Fingerprint of the last import of a source, None if never imported"""
+        row = self.connection.execute(
+            "SELECT fingerprint FROM documents WHERE source = ?", (source,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def mark_seen(self, source: str):
+        """Mark a source as still present without changing its recorded import"""
+        self.connection.execute(
+            "UPDATE documents SET seen = 1 WHERE source = ?", (source,)
+        )
+        self.connection.commit()
+
+    def record(self, source: str, name: str, fingerprint: str):
+        """Record a successful import of a source
+        @parameter source : str - Source URL of the document
+        @parameter name : str - Document name in Verba
+        @parameter fingerprint : str - Fingerprint of the imported content
+        """
+        self.connection.execute(
+            """
+            INSERT INTO documents (source, name, fingerprint, seen) VALUES (?, ?, ?, 1)
+            ON CONFLICT (source) DO UPDATE SET
+                name = excluded.name, fingerprint = excluded.fingerprint, seen = 1
+            """,
+            (source, name, fingerprint),
+        )
+        self.connection.commit()
+
+    def unseen(self) -> list[tuple[str, str]]:
+        """@returns list[tuple[str, str]] - (source, name) of documents not seen in the current pass"""
+        return self.connection.execute(
+            "SELECT source, name FROM documents WHERE seen = 0"
+        ).fetchall()
+
+    def forget(self, source: str):
+        """Remove a source from the record after its document was deleted"""
+        self.connection.execute("DELETE FROM documents WHERE source = ?", (source,))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+# Only these parts of the RAG config change what an import produces
+IMPORT_RAG_COMPONENTS = ["Reader", "Chunker", "Embedder"]
+
+
+def rag_config_fingerprint(rag_config: dict) -> str:
+    """Hash the parts of a RAG config that affect chunking and embedding
+    @parameter rag_config : dict[str, RAGComponentClass] - The RAG config
+    @returns str - Hex digest identifying the import relevant configuration
+    """
+    relevant = {}
+    for name in IMPORT_RAG_COMPONENTS:
+        component = rag_config.get(name) if rag_config else None
+        if hasattr(component, "model_dump"):
+            component = component.model_dump()
+        relevant[name] = component
+    serialized = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class ImportCache:
+    """Content-addressed record of successful imports
+
+    The key covers the name, source, labels and content of a document and the
+    import relevant RAG config, so a byte-identical document imported under
+    the same name with the same chunker and embedder can be skipped, while a
+    renamed document or any change to the RAG config misses the cache.
+    """
+
+    def __init__(self, path: str = "import_cache.db", rag_config: dict = None):
+        """
+        @parameter path : str - SQLite database file (":memory:" for a throwaway cache)
+        @parameter rag_config : dict[str, RAGComponentClass] - RAG config of every import of this run
+        """
+        self.rag_fingerprint = rag_config_fingerprint(rag_config)
+        # Shards running in separate processes write to the same file
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS imports (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                rag_fingerprint TEXT NOT NULL
+            )
+            """
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS imports_name ON imports (name)"
+        )
+        # Imports made with another chunker or embedder can never be hit again
+        self.connection.execute(
+            "DELETE FROM imports WHERE rag_fingerprint != ?", (self.rag_fingerprint,)
+        )
+        self.connection.commit()
+
+    def key(self, file_config) -> str:
+        """Compute the cache key of a document
+        @parameter file_config : FileConfig - The document to import
+        @returns str - The key
+        """
+        digest = hashlib.sha256()
+        digest.update(self.rag_fingerprint.encode("utf-8"))
+        digest.update(
+            json.dumps(
+                [file_config.filename, file_config.source, sorted(file_config.labels)]
+            ).encode("utf-8")
+        )
+        digest.update(file_config.content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def contains(self, key: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM imports WHERE key = ?", (key,)
+        ).fetchone()
+        return row is not None
+
+    def record(self, key: str, name: str):
+        """Record a successful import of a document, replacing earlier imports under its name"""
+        # Only the latest content of a name is in Weaviate, an earlier key must
+        # not match when the content changes back to it
+        self.connection.execute("DELETE FROM imports WHERE name = ?", (name,))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO imports (key, name, rag_fingerprint) VALUES (?, ?, ?)",
+            (key, name, self.rag_fingerprint),
+        )
+        self.connection.commit()
+
+    def forget(self, name: str):
+        """Drop the entries of a document, call after deleting it from Weaviate"""
+        self.connection.execute("DELETE FROM imports WHERE name = ?", (name,))
+        self.connection.commit()
+
+    def clear(self):
+        self.connection.execute("DELETE FROM imports")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import time
+
+try:
+    import tomllib
+except ModuleNotFoundError:
+    # Python 3.10
+    import tomli as tomllib
+
+import aiohttp
+from wasabi import msg  # type: ignore[import]
+
+from import_state import ImportCache
+from scheduler import BUDGET_KEYS, Scheduler
+from sources import get_sources
+
+CONFIG_KEYS = {
+    "concurrency",
+    "import_workers",
+    "import_cache",
+    "deadline",
+    "deadline_minutes",
+    "started_at",
+    "schedule_state",
+    "sources",
+}
+SOURCE_KEYS = {"name", "concurrency", "budget", "params"}
+
+
+class ConcurrencyLimiter:
+    """Async context manager bounding the number of concurrent operations
+
+    A limiter created with `child` holds a slot of its own budget and of every
+    parent budget, so per-source budgets share one global cap.
+    """
+
+    def __init__(self, limit: int = 1, parent: "ConcurrencyLimiter" = None):
+        self.limit = limit
+        self.parent = parent
+        self.semaphore = asyncio.Semaphore(limit)
+
+    def child(self, limit: int) -> "ConcurrencyLimiter":
+        """@returns ConcurrencyLimiter - A limiter with its own budget inside this one"""
+        return ConcurrencyLimiter(limit, self)
+
+    async def __aenter__(self):
+        # Take the own slot first, so a saturated source does not hold global slots while waiting
+        await self.semaphore.acquire()
+        if self.parent is not None:
+            try:
+                await self.parent.__aenter__()
+            except BaseException:
+                self.semaphore.release()
+                raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self.parent is not None:
+            await self.parent.__aexit__(exc_type, exc, tb)
+        self.semaphore.release()
+
+
+class ImportQueue:
+    """Funnels import_document calls of all sources through a fixed set of workers
+
+    Exposes the same `import_document` as the VerbaManager it wraps, and
+    forwards every other attribute to it, so it can be passed to the sources
+    in place of the manager. Documents found in the import cache are skipped
+    before they reach Verba, as long as they still exist in Weaviate.
+    """
+
+    def __init__(self, manager, workers: int = 1, cache: ImportCache = None):
+        """
+        @parameter manager : VerbaManager - Manager doing the actual imports
+        @parameter workers : int - Number of imports running at the same time
+        @parameter cache : ImportCache - Record of successful imports, None to import everything
+        """
+        self.manager = manager
+        self.cache = cache
+        self.queue = asyncio.Queue(maxsize=workers * 2)
+        self.imported = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors = []
+        self.workers = [asyncio.create_task(self._work()) for _ in range(workers)]
+
+    def __getattr__(self, name):
+        return getattr(self.manager, name)
+
+    async def _work(self):
+        while True:
+            client, file_config, cache_key, future = await self.queue.get()
+            try:
+                result = await self.manager.import_document(client, file_config)
+                self.imported += 1
+                if cache_key is not None:
+                    self.cache.record(cache_key, file_config.filename)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.failed += 1
+                self.errors.append(f"{file_config.filename}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def import_document(self, client, file_config):
+        """Queue a document and wait until it was imported
+        @returns Any - Return value of VerbaManager.import_document, False if the import cache skipped it
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(file_config)
+            if self.cache.contains(cache_key):
+                # Documents deleted from Weaviate since are imported again
+                if await self.manager.weaviate_manager.exist_document_name(
+                    client, file_config.filename
+                ):
+                    self.skipped += 1
+                    msg.info(f"Skipping {file_config.filename}, already imported")
+                    return False
+                self.cache.forget(file_config.filename)
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((client, file_config, cache_key, future))
+        return await future
+
+    def forget_document(self, name: str):
+        """Drop a deleted document from the import cache so it can be imported again"""
+        if self.cache is not None:
+            self.cache.forget(name)
+
+    async def close(self):
+        """Wait for all queued imports and stop the workers"""
+        await self.queue.join()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+
+
+def load_ingest_config(path: str, **overrides) -> dict:
+    """Load and validate a TOML ingestion config
+    @parameter path : str - Path to the config file
+    @parameter overrides : Any - Top-level keys replacing the ones of the file, e.g. command line options
+    @returns dict - The validated config with defaults filled in
+    """
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+    config.update(overrides)
+    return validate_ingest_config(config)
+
+
+def validate_ingest_config(config: dict) -> dict:
+    """Validate an ingestion config and fill in defaults
+    A relative `deadline_minutes` is turned into an absolute `deadline`, so
+    the deadline counts from validation and is the same for every shard.
+    `started_at` identifies the run in the checkpoints of all its shards.
+    @parameter config : dict - Parsed config
+    @returns dict - The validated config
+    """
+    unknown = set(config) - CONFIG_KEYS
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(sorted(unknown))}")
+
+    config.setdefault("concurrency", 8)
+    config.setdefault("import_workers", 1)
+    # Path of the import cache, an empty string disables it
+    config.setdefault("import_cache", "import_cache.db")
+    config.setdefault("schedule_state", "schedule_state.db")
+    deadline_minutes = config.pop("deadline_minutes", None)
+    if deadline_minutes is not None:
+        config["deadline"] = time.time() + deadline_minutes * 60
+    config.setdefault("deadline", None)
+    config.setdefault("started_at", time.time())
+    config.setdefault("sources", [])
+    for key in ("concurrency", "import_workers"):
+        if config[key] < 1:
+            raise ValueError(f"{key} must be at least 1, got {config[key]}")
+
+    for source in config["sources"]:
+        unknown = set(source) - SOURCE_KEYS
+        if unknown:
+            raise ValueError(
+                f"Unknown keys for source {source.get('name')}: {', '.join(sorted(unknown))}"
+            )
+        if "name" not in source:
+            raise ValueError("Every source needs a name")
+        source.setdefault("concurrency", config["concurrency"])
+        if source["concurrency"] < 1:
+            raise ValueError(
+                f"concurrency of source {source['name']} must be at least 1, got {source['concurrency']}"
+            )
+        source.setdefault("params", {})
+        source.setdefault("budget", {})
+        unknown = set(source["budget"]) - BUDGET_KEYS
+        if unknown:
+            raise ValueError(
+                f"Unknown budget keys for source {source['name']}: {', '.join(sorted(unknown))}"
+            )
+
+    # Fail before connecting to anything if a source does not exist
+    get_sources([source["name"] for source in config["sources"]])
+    return config
+
+
+async def run_ingestion(config: dict, client, manager, rag_config) -> dict:
+    """Run all sources of a config concurrently in the current event loop
+    Sources share one Weaviate client, one HTTP session, one import queue and
+    one global concurrency cap, and stop starting new items at the deadline or
+    when their budget is used up.
+    @parameter config : dict - Validated ingestion config
+    @returns dict - Stats with the imported, skipped and failed document counts, the errors,
+        the wall time in seconds per source name (None for failed sources) and the
+        exhausted budget per source that stopped early
+    """
+    names = [source["name"] for source in config["sources"]]
+    source_functions = get_sources(names)
+
+    limiter = ConcurrencyLimiter(config["concurrency"])
+    cache = (
+        ImportCache(config["import_cache"], rag_config) if config["import_cache"] else None
+    )
+    import_queue = ImportQueue(manager, config["import_workers"], cache)
+    scheduler = Scheduler(config["deadline"], config["schedule_state"], config["started_at"])
+    timings = {}
+    errors = []
+
+    async def run_source(source: dict, func):
+        checkpoint = scheduler.last_checkpoint(source["name"])
+        if checkpoint is not None and checkpoint["stopped"]:
+            msg.info(
+                f"Source {source['name']} stopped early last run ({checkpoint['stopped']} budget exhausted), "
+                f"{len(checkpoint['remaining'])} items were left"
+            )
+        start = time.perf_counter()
+        try:
+            await func(
+                client,
+                import_queue,
+                rag_config,
+                session=session,
+                limiter=limiter.child(source["concurrency"]),
+                budget=scheduler.budget(source["name"], **source["budget"]),
+                **source["params"],
+            )
+            timings[source["name"]] = time.perf_counter() - start
+            msg.good(f"Source {source['name']} finished in {timings[source['name']]:.1f}s")
+        except Exception as e:
+            timings[source["name"]] = None
+            errors.append(f"Source {source['name']}: {e}")
+            msg.fail(f"Source {source['name']} failed: {e}")
+
+    connector = aiohttp.TCPConnector(limit=config["concurrency"])
+    async with aiohttp.ClientSession(connector=connector) as session:
+        try:
+            await asyncio.gather(
+                *(
+                    run_source(source, func)
+                    for source, func in zip(config["sources"], source_functions)
+                )
+            )
+        finally:
+            await import_queue.close()
+            if cache is not None:
+                cache.close()
+            stopped = scheduler.save()
+            scheduler.close()
+
+    return {
+        "imported": import_queue.imported,
+        "skipped": import_queue.skipped,
+        "failed": import_queue.failed,
+        "errors": errors + import_queue.errors,
+        "sources": timings,
+        "stopped": {name: reason for name, reason in stopped.items() if reason},
+    }
+
+
+async def connect_and_ingest(config: dict) -> dict:
+    """Connect to the Weaviate instance configured in the environment and run a config
+    @parameter config : dict - Validated ingestion config
+    @returns dict - Stats of run_ingestion
+    """
+    from goldenverba import verba_manager
+    from goldenverba.server.types import Credentials
+
+    manager = verba_manager.VerbaManager()
+    credentials = Credentials(
+        deployment="Weaviate",
+        url=os.getenv("WEAVIATE_URL_VERBA"),
+        key=os.getenv("WEAVIATE_API_KEY_VERBA"),
+    )
+    client = await manager.connect(credentials)
+
+    try:
+        rag_config = await manager.load_rag_config(client)
+        if rag_config is None:
+            raise RuntimeError("Failed to load RAG config")
+        return await run_ingestion(config, client, manager, rag_config)
+    finally:
+        await client.close()
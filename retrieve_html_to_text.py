@@ -6,20 +6,30 @@ from textwrap import dedent
 from urllib.parse import urljoin
 import requests
 import asyncio
-from pyppeteer import launch
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 import time
 import aiohttp
 from aiohttp import ClientSession
 
+from crawl_state import CrawlState, normalize_url
+from streaming import DEFAULT_MAX_DOCUMENT_BYTES, DocumentTooLarge, read_body
 
-async def get_markdown_from_url(url: str):
 
-    html = await get_html(url)
+async def get_markdown_from_url(
+    url: str, session: ClientSession = None, accept_size=None, max_bytes=None
+):
+
+    html = await get_html(url, session, accept_size, max_bytes)
+    if html is None:
+        return None
+
+    return html_to_markdown(html)
+
 
+def html_to_markdown(html: str) -> str:
+    """Convert the HTML of a documentation page to markdown, without navigation and footer
+    @parameter html : str - HTML of the page
+    @returns str - The page as markdown
+    """
     # Parse the HTML with BeautifulSoup
     soup = BeautifulSoup(html, "html.parser")
 
@@ -35,9 +45,11 @@ async def get_markdown_from_url(url: str):
     h.ignore_links = True
     h.skip_internal_links = True
 
-    html_text = h.handle(str(soup))
+    html = str(soup)
+    soup.decompose()
+    del soup
 
-    return html_text
+    return h.handle(html)
 
 
 def get_href_from_homepage(url: str = "https://weaviate.io/developers/weaviate"):
@@ -57,16 +69,29 @@ def get_href_from_homepage(url: str = "https://weaviate.io/developers/weaviate")
     return hrefs
 
 
-async def get_html(url: str):
-    try:
+async def get_html(
+    url: str, session: ClientSession = None, accept_size=None, max_bytes=None
+):
+    if session is None:
         async with aiohttp.ClientSession() as session:
-            # Send an HTTP GET request to the specified URL
-            async with session.get(url) as response:
-                # Check if the request was successful (status code 200)
-                response.raise_for_status()
+            return await get_html(url, session, accept_size, max_bytes)
+
+    try:
+        # Send an HTTP GET request to the specified URL
+        async with session.get(url) as response:
+            # Check if the request was successful (status code 200)
+            response.raise_for_status()
 
-                # Extract the raw HTML content
-                return await response.text()
+            # Decide on the Content-Length header before downloading the body
+            if accept_size is not None and not accept_size(response.content_length):
+                return None
+
+            # Read the raw HTML content in chunks, up to max_bytes
+            body = await read_body(response, max_bytes)
+            return body.decode(response.charset or "utf-8", errors="replace")
+
+    except DocumentTooLarge as e:
+        print(f"Skipping: {e}")
 
     except aiohttp.ClientError as e:
         # Handle errors that occur during the request
@@ -74,6 +99,9 @@ async def get_html(url: str):
 
 
 async def get_html_js(url: str):
+    # Browser automation is only needed for pages rendered with JavaScript
+    from pyppeteer import launch
+
     browser = await launch(headless=True)
     page = await browser.newPage()
     await page.goto(url)
@@ -84,6 +112,11 @@ async def get_html_js(url: str):
 
 
 def get_html_selenium(url: str):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
     # Set options for the WebDriver, for example, to run in headless mode
     options = Options()
     options.add_argument("user-agent=whatever you want")
@@ -110,39 +143,66 @@ def get_html_selenium(url: str):
 
 async def recursive_get_hrefs(
     base_url: str = "https://weaviate.io/developers/weaviate",
+    state: CrawlState = None,
+    session: ClientSession = None,
+    max_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+    with_html: bool = False,
+    delay: float = 0.5,
 ):
-    visited = set()
-    to_visit = {base_url}
-
-    async with ClientSession() as session:
-        while to_visit:
-            url = to_visit.pop()
-            if url in visited:
-                continue
+    """Crawl all pages below a base URL, yielding every page once
+    @parameter base_url : str - URL to start from, also restricts the crawl scope
+    @parameter state : CrawlState - Persistent crawl state, pass one to share or resume a crawl
+    @parameter session : ClientSession - Shared session, a new one is opened if None
+    @parameter max_bytes : int - Pages larger than this are not parsed for links
+    @parameter with_html : bool - Yield the fetched HTML along with the URL, so it is not fetched again
+    @parameter delay : float - Seconds to wait between two pages
+    @returns AsyncIterator[str | tuple[str, str]] - Normalized URLs of the visited pages, or (url, html)
+    """
+    owns_state = state is None
+    if owns_state:
+        state = CrawlState(":memory:")
+    owns_session = session is None
+    if owns_session:
+        session = ClientSession()
+
+    base_url = normalize_url(base_url)
+    state.push(base_url)
 
+    try:
+        while (url := state.pop()) is not None:
             print(f"Visiting: {url}")
             try:
                 async with session.get(url) as response:
-                    html = await response.text()
+                    # Error pages are not content, the page is recorded as failed
+                    response.raise_for_status()
+                    # Relative links resolve against the final URL with its trailing
+                    # slash, not against the normalized one
+                    page_url = str(response.url)
+                    body = await read_body(response, max_bytes)
+                    html = body.decode(response.charset or "utf-8", errors="replace")
+                    del body
             except Exception as e:
                 print(f"Error fetching {url}: {e}")
+                state.done(url, failed=True)
                 continue
 
-            visited.add(url)
-            yield url
+            # Marked as done only after the consumer took it, so an
+            # interrupted crawl yields the page again on resume
+            yield (url, html) if with_html else url
 
             soup = BeautifulSoup(html, "html.parser")
+            links = []
             for a in soup.find_all("a", href=True):
-                href = a["href"]
-                full_url = urljoin(base_url, href)
-
-                if (
-                    full_url.startswith(base_url)
-                    and "/developers" in full_url
-                    and not "#" in full_url
-                ):
-                    if full_url not in visited and full_url not in to_visit:
-                        to_visit.add(full_url)
-                        yield full_url
-
-            await asyncio.sleep(0.5)
+                full_url = normalize_url(urljoin(page_url, a["href"]))
+
+                if full_url.startswith(base_url) and "/developers" in full_url:
+                    links.append(full_url)
+            state.push_many(links)
+            state.done(url)
+
+            await asyncio.sleep(delay)
+    finally:
+        if owns_session:
+            await session.close()
+        if owns_state:
+            state.close()
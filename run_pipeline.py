@@ -1,3 +1,4 @@
+import asyncio
 import os
 import re
 from datetime import datetime
@@ -14,25 +15,28 @@ from goldenverba.server.types import (
 )
 
 from weaviate.client import WeaviateAsyncClient
+import aiohttp
 
 from fetch_github import (
-    fetch_docs,
+    fetch_tree,
     download_file,
     is_link_working,
 )
 
-from transcript import (
-    load_configuration,
-    fetch_transcripts,
-    get_all_video_ids,
-    fetch_youtube_transcripts,
-)
-
-from retrieve_html_to_text import (
-    get_href_from_homepage,
-    get_markdown_from_url,
-    recursive_get_hrefs,
+from crawl_state import CrawlState, url_depth
+from scheduler import SourceBudget, path_depth
+from filters import FilterPipeline, PATH, SIZE, CONTENT
+from streaming import DEFAULT_MAX_DOCUMENT_BYTES
+from import_state import ImportState, content_fingerprint
+from sources import SOURCES, register_source, register_lister
+from ingest import (
+    ConcurrencyLimiter,
+    ImportQueue,
+    load_ingest_config,
+    validate_ingest_config,
+    connect_and_ingest,
 )
+from shard import run_sharded
 
 from wasabi import msg  # type: ignore[import]
 from dotenv import load_dotenv
@@ -55,65 +59,231 @@ async def scrape_documentation(
     manager: verba_manager.VerbaManager,
     rag_config: dict[str, RAGComponentClass],
     verbose: bool = False,
+    crawl_state_path: str = "crawl_state.db",
+    resume: bool = True,
+    reconcile: bool = False,
+    import_state_path: str = "import_state.db",
+    session: aiohttp.ClientSession = None,
+    limiter: ConcurrencyLimiter = None,
+    urls: list[str] = None,
+    budget: SourceBudget = None,
+    filters: FilterPipeline = None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+    base_url: str = "https://weaviate.io/developers/weaviate",
+    crawl_delay: float = 0.5,
 ):
+    """Crawls weaviate.io/developers and imports every page
+    @parameter crawl_state_path : str - SQLite file holding the crawl frontier and visited URLs
+    @parameter resume : bool - Continue an interrupted crawl instead of starting over
+    @parameter reconcile : bool - Only import new or changed pages and delete pages that disappeared
+    @parameter import_state_path : str - SQLite file holding the fingerprints of imported pages
+    @parameter session : aiohttp.ClientSession - Shared HTTP session
+    @parameter limiter : ConcurrencyLimiter - Bounds the pages fetched and imported at once
+    @parameter urls : list[str] - Import only these pages instead of crawling, removed pages are not deleted
+    @parameter budget : SourceBudget - Deadline and limits of the run, at most 100000 documents unless configured
+    @parameter filters : FilterPipeline - Rules deciding which pages to import, documentation_filters() if None
+    @parameter max_document_bytes : int - Pages with a larger HTML body are skipped without reading it fully
+    @parameter base_url : str - Page the crawl starts from, only pages below it are crawled
+    @parameter crawl_delay : float - Seconds between two page requests of the crawler
+    """
+    # Pulls in bs4, html2text, pyppeteer and selenium, only needed for this source
+    from retrieve_html_to_text import (
+        get_markdown_from_url,
+        html_to_markdown,
+        recursive_get_hrefs,
+    )
+
     msg.divider(f"Starting scraping weaviate.io")
+    limiter = limiter or ConcurrencyLimiter(1)
+    budget = budget or SourceBudget()
+    budget.setdefault(max_documents=100000)
+    filters = filters or documentation_filters(max_document_bytes)
 
     try:
-        doc_counter = 0
-        max_docs = 100000
+        state = None
+        fresh_crawl = False
+        if urls is None:
+            state = CrawlState(crawl_state_path)
+            fresh_crawl = state.begin(resume)
+
+        import_state = ImportState(import_state_path)
+        if reconcile and fresh_crawl:
+            import_state.start_pass()
+        unchanged_counter = 0
+        complete = True
+
+        async def import_page(link: str, html: str = None):
+            nonlocal unchanged_counter
+            doc_name = (
+                link.replace("https://weaviate.io/", "")
+                .replace("developers/weaviate/", "")
+                .replace("/", "_")
+                .replace("-", "_")
+                .replace("#", "_")
+                .replace("developers_weaviate_", "")
+            )
 
-        links = set()
+            if not filters.accept(PATH, link):
+                return
 
-        msg.divider(f"Starting retrieval of {max_docs} documents")
-        async for link in recursive_get_hrefs():
             try:
-                if link in links:
-                    continue
-                links.add(link)
-                if doc_counter >= max_docs:
-                    break
-                markdown = await get_markdown_from_url(link)
-
-                doc_name = (
-                    link.replace("https://weaviate.io/", "")
-                    .replace("developers/weaviate/", "")
-                    .replace("/", "_")
-                    .replace("-", "_")
-                    .replace("#", "_")
-                    .replace("developers_weaviate_", "")
-                )
-
-                if len(markdown) < 1500 or "docusaurus_skipToContent" in doc_name:
-                    continue
-
-                file_config = FileConfig(
-                    fileID=doc_name,
-                    filename=doc_name,
-                    isURL=False,
-                    overwrite=False,
-                    extension="",
-                    source=link,
-                    content=markdown,
-                    labels=["Documentation"],
-                    rag_config=rag_config,
-                    file_size=len(markdown),
-                    status=FileStatus.STARTING,
-                    metadata="",
-                    status_report={},
-                )
-
-                doc_counter += 1
-                msg.info(f"Importing {file_config.filename} | {doc_counter}")
-                await manager.import_document(client, file_config)
+                async with limiter:
+                    if not await budget.reserve():
+                        budget.leave(link)
+                        # Not imported this time, but not removed either
+                        import_state.mark_seen(link)
+                        return
+                    imported = False
+                    try:
+                        if html is not None:
+                            # Already fetched by the crawler
+                            markdown = html_to_markdown(html)
+                            del html
+                        else:
+                            markdown = await get_markdown_from_url(
+                                link,
+                                session,
+                                lambda size: filters.accept(SIZE, size),
+                                max_document_bytes,
+                            )
+                            budget.charge(api_calls=1)
+                        if markdown is None:
+                            import_state.mark_seen(link)
+                            return
+                        budget.charge(bytes=len(markdown))
+
+                        if not filters.accept(CONTENT, markdown):
+                            return
+
+                        fingerprint = content_fingerprint(markdown)
+                        previous_fingerprint = import_state.fingerprint(link)
+                        if reconcile and previous_fingerprint == fingerprint:
+                            import_state.mark_seen(link)
+                            unchanged_counter += 1
+                            return
+
+                        file_config = FileConfig(
+                            fileID=doc_name,
+                            filename=doc_name,
+                            isURL=False,
+                            overwrite=reconcile and previous_fingerprint is not None,
+                            extension="",
+                            source=link,
+                            content=markdown,
+                            labels=["Documentation"],
+                            rag_config=rag_config,
+                            file_size=len(markdown),
+                            status=FileStatus.STARTING,
+                            metadata="",
+                            status_report={},
+                        )
+
+                        msg.info(f"Importing {file_config.filename} | {budget.documents}")
+                        imported = await manager.import_document(client, file_config) is not False
+                        import_state.record(link, doc_name, fingerprint)
+                    finally:
+                        await budget.release(imported)
             except Exception as e:
-                msg.fail(f"Failed to import {file_config.filename}: {e}")
-                continue
+                import_state.mark_seen(link)
+                msg.fail(f"Failed to import {doc_name}: {e}")
+
+        msg.divider(f"Starting retrieval of documents")
+        if urls is not None:
+            if reconcile:
+                msg.warn("Importing a list of URLs, removed pages are not deleted")
+            urls = budget.prioritize(urls, key=str, depth=url_depth)
+            links = iterate((url, None) for url in urls)
+            # Only a full crawl tells which pages disappeared
+            complete = False
+        else:
+            links = recursive_get_hrefs(
+                base_url,
+                state=state,
+                session=session,
+                max_bytes=max_document_bytes,
+                with_html=True,
+                delay=crawl_delay,
+            )
+
+        pending = set()
+        position = 0
+        async for link, html in links:
+            if budget.exhausted():
+                # An interrupted crawl keeps its frontier in the crawl state
+                if urls is not None:
+                    for url in urls[position:]:
+                        budget.leave(url)
+                complete = False
+                break
+            position += 1
+            if urls is None:
+                budget.charge(api_calls=1)
+            task = asyncio.create_task(import_page(link, html))
+            del html
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+            # Keep the crawl from running ahead of the imports, this also
+            # bounds the pages lost from an interrupted crawl to the limit
+            if len(pending) >= limiter.limit:
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        await asyncio.gather(*pending)
+
+        if state is not None:
+            await links.aclose()
+            # The crawler already marked pages left by the budget as visited,
+            # put them back so the resumed crawl imports them
+            for url in budget.remaining:
+                state.requeue(url)
+            # Pages that failed to load are kept, they may well still exist
+            for url in state.failed():
+                import_state.mark_seen(url)
+        if budget.stopped:
+            complete = False
+
+        msg.good(f"All {budget.documents} files successfully loaded")
+        filters.report()
+        if budget.stopped:
+            msg.warn(f"Stopped early, {budget.stopped} budget exhausted")
+
+        if reconcile:
+            msg.info(f"Skipped {unchanged_counter} unchanged files")
+            if complete:
+                await delete_removed_documents(client, manager, import_state)
+            else:
+                msg.warn("Crawl did not complete, skipping deletion of removed pages")
 
-        msg.good(f"All {doc_counter} files successfully loaded")
+        import_state.close()
+        if state is not None:
+            state.close()
     except Exception as e:
         msg.fail(f"Failed to load documentation: {e}")
 
 
+async def delete_removed_documents(
+    client: WeaviateAsyncClient,
+    manager: verba_manager.VerbaManager,
+    import_state: ImportState,
+):
+    """Deletes documents whose source was not seen during the last full pass
+    @parameter import_state : ImportState - Record of the imported documents
+    """
+    removed = import_state.unseen()
+    msg.info(f"Deleting {len(removed)} removed documents")
+
+    for source, name in removed:
+        try:
+            uuid = await manager.weaviate_manager.exist_document_name(client, name)
+            if uuid is not None:
+                await manager.weaviate_manager.delete_document(client, uuid)
+            import_state.forget(source)
+            if isinstance(manager, ImportQueue):
+                manager.forget_document(name)
+            msg.info(f"Deleted {name} ({source})")
+        except Exception as e:
+            msg.fail(f"Failed to delete {name}: {e}")
+
+
 def find_common_substring(texts, verbose: bool = False):
     """Find common substrings at the beginning and end in pairs of texts."""
     if not texts:
@@ -187,35 +357,87 @@ async def retrieve_transcripts(
     client: WeaviateAsyncClient = None,
     manager: verba_manager.VerbaManager = None,
     rag_config: dict[str, RAGComponentClass] = None,
+    limiter: ConcurrencyLimiter = None,
+    video_ids: list = None,
+    budget: SourceBudget = None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
 ):
     """Downloads video transcript from YouTube
     @parameter api_key : str - YouTube API key
     @parameter channel_id : str - YouTube channel ID
     @parameter doc_type : str - Document type (code, blogpost, podcast)
+    @parameter limiter : ConcurrencyLimiter - Bounds the transcripts fetched and imported at once
+    @parameter video_ids : list - (id, title, description) of the videos to import, all videos of the channel if None
+    @parameter budget : SourceBudget - Deadline and limits of the run, unlimited if None
+    @parameter max_document_bytes : int - Transcripts longer than this are skipped
     @returns list[Doc] - A list of spaCy documents
     """
+    from transcript import fetch_transcript, get_all_video_ids
+
     print(f"Starting downloading {doc_type} from channel ID {channel_id}")
+    limiter = limiter or ConcurrencyLimiter(1)
+    budget = budget or SourceBudget()
 
-    video_ids = get_all_video_ids(api_key, channel_id)
-    for whole_text, title, link in fetch_transcripts(video_ids):
-        if whole_text is not None:
-            file_config = FileConfig(
-                fileID=title,
-                filename=title,
-                isURL=False,
-                overwrite=False,
-                extension="",
-                source=link,
-                content=whole_text,
-                labels=[doc_type],
-                rag_config=rag_config,
-                file_size=len(whole_text),
-                status=FileStatus.STARTING,
-                metadata="",
-                status_report={},
-            )
-            msg.info(f"Importing {file_config.filename}")
-            await manager.import_document(client, file_config)
+    async def import_video(video):
+        video_id = video[0]
+        try:
+            # The YouTube clients are blocking, keep them off the event loop
+            async with limiter:
+                if not await budget.reserve():
+                    budget.leave(video_id)
+                    return
+                imported = False
+                try:
+                    whole_text, title, link = await asyncio.to_thread(fetch_transcript, video)
+                    budget.charge(api_calls=1)
+                    size = len(whole_text.encode("utf-8")) if whole_text is not None else 0
+                    if size > max_document_bytes:
+                        msg.warn(f"Skipping {title}, transcript larger than {max_document_bytes} bytes")
+                        whole_text = None
+                    if whole_text is not None:
+                        budget.charge(bytes=size)
+                        file_config = FileConfig(
+                            fileID=title,
+                            filename=title,
+                            isURL=False,
+                            overwrite=False,
+                            extension="",
+                            source=link,
+                            content=whole_text,
+                            labels=[doc_type],
+                            rag_config=rag_config,
+                            file_size=len(whole_text),
+                            status=FileStatus.STARTING,
+                            metadata="",
+                            status_report={},
+                        )
+                        msg.info(f"Importing {file_config.filename}")
+                        try:
+                            imported = (
+                                await manager.import_document(client, file_config) is not False
+                            )
+                        except Exception as e:
+                            msg.fail(f"Failed to import {file_config.filename}: {e}")
+                            return
+                    budget.done(video_id, video_id)
+                finally:
+                    await budget.release(imported)
+        except Exception as e:
+            msg.fail(f"Failed to import video {video_id}: {e}")
+
+    if video_ids is None:
+        video_ids = await asyncio.to_thread(get_all_video_ids, api_key, channel_id)
+        # One search request per page of 50 videos
+        budget.charge(api_calls=len(video_ids) // 50 + 1)
+
+    # Videos not processed before first, the API already returns them newest first
+    video_ids = budget.prioritize(
+        video_ids, key=lambda video: video[0], version=lambda video: video[0]
+    )
+    await asyncio.gather(*(import_video(video) for video in video_ids))
+
+    if budget.stopped:
+        msg.warn(f"Stopped early, {budget.stopped} budget exhausted")
 
 
 async def download_from_github(
@@ -227,6 +449,12 @@ async def download_from_github(
     client: WeaviateAsyncClient = None,
     manager: verba_manager.VerbaManager = None,
     rag_config: dict[str, RAGComponentClass] = None,
+    session: aiohttp.ClientSession = None,
+    limiter: ConcurrencyLimiter = None,
+    entries: list[dict] = None,
+    budget: SourceBudget = None,
+    filters: FilterPipeline = None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
 ):
     """Downloads .mdx/.md files from Github
     @parameter owner : str - Repo owner
@@ -234,55 +462,142 @@ async def download_from_github(
     @parameter folder_path : str - Directory in repo to fetch from
     @parameter token : str - Github token
     @parameter doc_type : str - Document type (code, blogpost, podcast)
+    @parameter session : aiohttp.ClientSession - Shared HTTP session
+    @parameter limiter : ConcurrencyLimiter - Bounds the files downloaded and imported at once
+    @parameter entries : list[dict] - Tree entries (see fetch_tree) of the files to import, all files of the folder if None
+    @parameter budget : SourceBudget - Deadline and limits of the run, at most 10000 documents unless configured
+    @parameter filters : FilterPipeline - Rules deciding which files to import, github_filters(doc_type) if None
+    @parameter max_document_bytes : int - Larger files are skipped, from the tree listing when possible
     @returns list[Doc] - A list of spaCy documents
     """
     msg.divider(f"Starting downloading {doc_type} from {owner}/{repo}/{folder_path}")
-    document_names = fetch_docs(owner, repo, folder_path, token)
-    msg.info(f"Found {len(document_names)} documents")
-
-    doc_counter = 0
-    max_docs = 10000
+    limiter = limiter or ConcurrencyLimiter(1)
+    budget = budget or SourceBudget()
+    budget.setdefault(max_documents=10000)
+    filters = filters or github_filters(doc_type, max_document_bytes)
+    if entries is None:
+        entries = await asyncio.to_thread(fetch_tree, owner, repo, folder_path, token)
+        budget.charge(api_calls=1)
+    msg.info(f"Found {len(entries)} documents")
+
+    # Decide whatever the tree listing allows before downloading anything
+    entries = [
+        entry
+        for entry in entries
+        if filters.accept(PATH, entry["path"]) and filters.accept(SIZE, entry["size"])
+    ]
+    msg.info(f"{len(entries)} documents left after the path and size filters")
+
+    # Files whose blob changed since the last run first, then the shallow ones
+    entries = budget.prioritize(
+        entries,
+        key=lambda entry: entry["path"],
+        version=lambda entry: entry["sha"],
+        depth=lambda entry: path_depth(entry["path"]),
+    )
 
-    for document_name in document_names:
+    async def import_file(entry: dict):
         try:
-            if doc_counter >= max_docs:
-                break
-            fetched_text, link, path = await download_file(
-                owner, repo, document_name, token
-            )
+            async with limiter:
+                if not await budget.reserve():
+                    budget.leave(entry["path"])
+                    return
+                imported = False
+                try:
+                    try:
+                        fetched_text, link, path = await download_file(
+                            owner, repo, entry["path"], token, session, max_document_bytes
+                        )
+                        budget.charge(bytes=len(fetched_text), api_calls=1)
+                    except Exception as e:
+                        msg.fail(str(e))
+                        return
+
+                    text = cleaning(fetched_text, doc_type)
+                    if filters.accept(CONTENT, text):
+                        # process_url checks the link with a blocking request
+                        source = await asyncio.to_thread(
+                            process_url, str(path), doc_type, fetched_text
+                        )
+                        budget.charge(api_calls=1)
+                        # Only the cleaned text is needed from here on, don't hold both
+                        # while the document waits for its import
+                        del fetched_text
+
+                        file_config = FileConfig(
+                            fileID=process_filename(str(path), doc_type),
+                            filename=process_filename(str(path), doc_type),
+                            isURL=False,
+                            overwrite=False,
+                            extension="",
+                            source=source,
+                            content=text,
+                            labels=[doc_type],
+                            rag_config=rag_config,
+                            file_size=len(text),
+                            status=FileStatus.STARTING,
+                            metadata="",
+                            status_report={},
+                        )
+
+                        msg.info(f"Importing {file_config.filename} | {budget.documents}")
+                        try:
+                            imported = (
+                                await manager.import_document(client, file_config) is not False
+                            )
+                        except Exception as e:
+                            msg.fail(f"Failed to import {file_config.filename}: {e}")
+                            return
+                    budget.done(entry["path"], entry["sha"])
+                finally:
+                    await budget.release(imported)
         except Exception as e:
-            msg.fail(str(e))
-
-        if filtering(path, doc_type):
-            text = cleaning(fetched_text, doc_type)
-            if len(text) > 1500:
-
-                file_config = FileConfig(
-                    fileID=process_filename(str(path), doc_type),
-                    filename=process_filename(str(path), doc_type),
-                    isURL=False,
-                    overwrite=False,
-                    extension="",
-                    source=process_url(str(path), doc_type, fetched_text),
-                    content=cleaning(fetched_text, doc_type),
-                    labels=[doc_type],
-                    rag_config=rag_config,
-                    file_size=len(cleaning(fetched_text, doc_type)),
-                    status=FileStatus.STARTING,
-                    metadata="",
-                    status_report={},
-                )
-
-                doc_counter += 1
-                msg.info(f"Importing {file_config.filename} | {doc_counter}")
-                await manager.import_document(client, file_config)
-
-    msg.good(f"All {len(doc_counter)} files successfully loaded")
+            msg.fail(f"Failed to import {entry['path']}: {e}")
+
+    await asyncio.gather(*(import_file(entry) for entry in entries))
+
+    msg.good(f"All {budget.documents} files successfully loaded")
+    filters.report()
+    if budget.stopped:
+        msg.warn(f"Stopped early, {budget.stopped} budget exhausted")
 
 
 # Data Filtering
 
 
+def documentation_filters(
+    max_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+) -> FilterPipeline:
+    """Filters for pages crawled from weaviate.io
+    @parameter max_bytes : int - Maximum size of the HTML of a page
+    @returns FilterPipeline - Rules rejecting short and oversized pages
+    """
+    # Content-Length is the compressed size, so it cannot reject short pages
+    return (
+        FilterPipeline("Documentation")
+        .add(SIZE, "max_size", lambda size: size <= max_bytes)
+        .add(CONTENT, "min_length", lambda markdown: len(markdown) >= 1500)
+    )
+
+
+def github_filters(
+    document_type: str, max_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES
+) -> FilterPipeline:
+    """Filters for files downloaded from Github
+    @parameter document_type : str - Document Type
+    @parameter max_bytes : int - Maximum file size
+    @returns FilterPipeline - Rules rejecting excluded paths, short and oversized documents
+    """
+    return (
+        FilterPipeline(document_type)
+        .add(PATH, "excluded_path", lambda path: filtering(path, document_type))
+        # Cleaning only removes text, files this small never pass min_length
+        .add(SIZE, "min_size", lambda size: size > 1500)
+        .add(SIZE, "max_size", lambda size: size <= max_bytes)
+        .add(CONTENT, "min_length", lambda text: len(text) > 1500)
+    )
+
+
 def filtering(document_path: str, document_type: str) -> bool:
     """Filters documents based on their path and document type
     @parameter document_path : str - Document Path
@@ -493,52 +808,247 @@ def blog_process_url(document_text: str) -> str:
     return full_url
 
 
+# Sources
+# Every source takes the shared client, manager and RAG config, the optional
+# shared HTTP session, concurrency limiter and budget of the runner, and its
+# own parameters from the ingestion config as keyword arguments. Sources with
+# a lister also take `items`, a subset of the listed work items to process.
+
+
+async def iterate(items):
+    for item in items:
+        yield item
+
+
+# Not sharded: the crawl discovers its pages while fetching them, so listing
+# them up front would fetch every page twice. It runs in shard 0.
+@register_source("docs", "Crawl and import weaviate.io/developers")
+async def docs_source(
+    client,
+    manager,
+    rag_config,
+    session=None,
+    limiter=None,
+    budget=None,
+    **params,
+):
+    await scrape_documentation(
+        client,
+        manager,
+        rag_config,
+        session=session,
+        limiter=limiter,
+        budget=budget,
+        **params,
+    )
+
+
+@register_source("github", "Import .md/.mdx/.txt files of a GitHub folder")
+async def github_source(
+    client,
+    manager,
+    rag_config,
+    session=None,
+    limiter=None,
+    budget=None,
+    items=None,
+    owner: str = "weaviate",
+    repo: str = "weaviate-io",
+    folder_path: str = "",
+    doc_type: str = "Documentation",
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+):
+    await download_from_github(
+        owner,
+        repo,
+        folder_path,
+        os.environ.get("GITHUB_TOKEN", ""),
+        doc_type,
+        client,
+        manager,
+        rag_config,
+        session=session,
+        limiter=limiter,
+        entries=items,
+        budget=budget,
+        max_document_bytes=max_document_bytes,
+    )
+
+
+@register_lister("github")
+async def list_github(
+    owner: str = "weaviate",
+    repo: str = "weaviate-io",
+    folder_path: str = "",
+    **params,
+) -> list[dict]:
+    return await asyncio.to_thread(
+        fetch_tree, owner, repo, folder_path, os.environ.get("GITHUB_TOKEN", "")
+    )
+
+
+@register_source("blog", "Import the blog posts of weaviate/weaviate-io")
+async def blog_source(
+    client,
+    manager,
+    rag_config,
+    session=None,
+    limiter=None,
+    budget=None,
+    items=None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+):
+    await github_source(
+        client,
+        manager,
+        rag_config,
+        session,
+        limiter,
+        budget,
+        items,
+        folder_path="blog/",
+        doc_type="Blog",
+        max_document_bytes=max_document_bytes,
+    )
+
+
+@register_lister("blog")
+async def list_blog(**params) -> list[dict]:
+    return await list_github(folder_path="blog/")
+
+
+@register_source("code", "Import the code examples of weaviate/weaviate-io")
+async def code_source(
+    client,
+    manager,
+    rag_config,
+    session=None,
+    limiter=None,
+    budget=None,
+    items=None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+):
+    await github_source(
+        client,
+        manager,
+        rag_config,
+        session,
+        limiter,
+        budget,
+        items,
+        folder_path="_includes/code",
+        doc_type="Code",
+        max_document_bytes=max_document_bytes,
+    )
+
+
+@register_lister("code")
+async def list_code(**params) -> list[dict]:
+    return await list_github(folder_path="_includes/code")
+
+
+@register_source("videos", "Import the transcripts of the YouTube channel")
+async def videos_source(
+    client,
+    manager,
+    rag_config,
+    session=None,
+    limiter=None,
+    budget=None,
+    items=None,
+    max_document_bytes: int = DEFAULT_MAX_DOCUMENT_BYTES,
+):
+    from transcript import load_configuration
+
+    api, channel = load_configuration()
+    await retrieve_transcripts(
+        api,
+        channel,
+        "Video",
+        client,
+        manager,
+        rag_config,
+        limiter=limiter,
+        video_ids=items,
+        budget=budget,
+        max_document_bytes=max_document_bytes,
+    )
+
+
+@register_lister("videos")
+async def list_videos(**params) -> list:
+    from transcript import load_configuration, get_all_video_ids
+
+    api, channel = load_configuration()
+    return await asyncio.to_thread(get_all_video_ids, api, channel)
+
+
 if __name__ == "__main__":
-    import asyncio
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import Weaviate data into Verba")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument(
+        "--sources",
+        nargs="+",
+        default=["videos"],
+        metavar="SOURCE",
+        help="Sources to run concurrently with default parameters: "
+        + ", ".join(
+            f"{name} ({func.source_description})" for name, func in SOURCES.items()
+        ),
+    )
+    selection.add_argument(
+        "--config",
+        help="TOML ingestion config listing the sources, their parameters and concurrency budgets",
+    )
+    parser.add_argument(
+        "--no-import-cache",
+        action="store_true",
+        help="Import every document, even if the same content was imported with the same RAG config before",
+    )
+    parser.add_argument(
+        "--deadline-minutes",
+        type=float,
+        help="Stop starting new documents after this many minutes, overrides the config",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Split the work of every source across this many processes",
+    )
+    args = parser.parse_args()
 
-    async def main():
-        try:
-            manager = verba_manager.VerbaManager()
-            credentials = Credentials(
-                deployment="Weaviate",
-                url=os.getenv("WEAVIATE_URL_VERBA"),
-                key=os.getenv("WEAVIATE_API_KEY_VERBA"),
-            )
-            client: WeaviateAsyncClient = await manager.connect(credentials)
-
-            msg.info("Deleting all documents")
-
-            # await manager.weaviate_manager.delete_all_documents(client)
-
-            rag_config = await manager.load_rag_config(client)
-
-            if rag_config is not None:
-                # await scrape_documentation(client, manager, rag_config)
-                # await download_from_github(
-                #     "weaviate",
-                #     "weaviate-io",
-                #     "blog/",
-                #     os.environ.get("GITHUB_TOKEN", ""),
-                #     "Blog",
-                #     client,
-                #     manager,
-                #     rag_config,
-                # )
-                api, channel = load_configuration()
-                await retrieve_transcripts(
-                    api,
-                    channel,
-                    "Video",
-                    client,
-                    manager,
-                    rag_config,
-                )
-            else:
-                msg.fail("Failed to load RAG config")
+    overrides = {}
+    if args.deadline_minutes is not None:
+        overrides["deadline_minutes"] = args.deadline_minutes
+    if args.no_import_cache:
+        overrides["import_cache"] = ""
 
-            await client.close()
-        except Exception as e:
-            msg.fail(f"Failed to run pipeline: {e}")
-            await client.close()
+    try:
+        if args.config:
+            config = load_ingest_config(args.config, **overrides)
+        else:
+            config = validate_ingest_config(
+                {"sources": [{"name": name} for name in args.sources], **overrides}
+            )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
 
-    asyncio.run(main())
+    try:
+        if args.workers > 1:
+            stats = run_sharded(config, args.workers)
+        else:
+            stats = asyncio.run(connect_and_ingest(config))
+    except Exception as e:
+        msg.fail(f"Failed to run pipeline: {e}")
+    else:
+        msg.divider(
+            f"{stats['imported']} documents imported, {stats['skipped']} skipped, "
+            f"{stats['failed']} failed"
+        )
+        for error in stats["errors"]:
+            msg.fail(error)
+        for name, reason in stats["stopped"].items():
+            msg.warn(f"{name} stopped early, {reason} budget exhausted")
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+BUDGET_KEYS = {"documents", "bytes", "api_calls"}
+
+
+class SourceBudget:
+    """Limits one source by a wall-clock deadline and by documents, bytes and API calls
+
+    Sources `reserve` a document before every work item, `charge` what the
+    item cost and `release` the document once it was imported or dropped.
+    Items that were never reached are collected with `leave`, items that were
+    fully processed with `done`, so the next run can start where this one
+    stopped.
+    """
+
+    def __init__(
+        self,
+        deadline: float = None,
+        max_documents: int = None,
+        max_bytes: int = None,
+        max_api_calls: int = None,
+        versions: dict = None,
+    ):
+        """
+        @parameter deadline : float - Unix time after which no new item is started
+        @parameter max_documents : int - Maximum number of imported documents
+        @parameter max_bytes : int - Maximum number of downloaded bytes
+        @parameter max_api_calls : int - Maximum number of HTTP/API requests
+        @parameter versions : dict - Item versions recorded by the previous run
+        """
+        self.deadline = deadline
+        self.max_documents = max_documents
+        self.max_bytes = max_bytes
+        self.max_api_calls = max_api_calls
+        self.previous_versions = versions or {}
+
+        self.documents = 0
+        self.bytes = 0
+        self.api_calls = 0
+        self.versions = {}
+        self.reserved = 0
+        self.released = asyncio.Condition()
+        self.remaining = []
+        self.stopped = None
+
+    def setdefault(
+        self, max_documents: int = None, max_bytes: int = None, max_api_calls: int = None
+    ):
+        """Apply the default limits of a source to the limits that were not configured"""
+        if self.max_documents is None:
+            self.max_documents = max_documents
+        if self.max_bytes is None:
+            self.max_bytes = max_bytes
+        if self.max_api_calls is None:
+            self.max_api_calls = max_api_calls
+
+    def exhausted(self) -> bool:
+        """@returns bool - Whether the deadline passed or any budget is used up"""
+        if self.stopped is None:
+            if self.deadline is not None and time.time() >= self.deadline:
+                self.stopped = "deadline"
+            elif self.max_documents is not None and self.documents >= self.max_documents:
+                self.stopped = "documents"
+            elif self.max_bytes is not None and self.bytes >= self.max_bytes:
+                self.stopped = "bytes"
+            elif self.max_api_calls is not None and self.api_calls >= self.max_api_calls:
+                self.stopped = "api_calls"
+        return self.stopped is not None
+
+    async def reserve(self) -> bool:
+        """Claim a document before starting an item
+        Documents of items in flight count against max_documents, so concurrent
+        items cannot overshoot it. While the remaining documents are all claimed
+        an item waits, since items in flight may still turn out not to import.
+        @returns bool - Whether the item may start, False if the budget is exhausted
+        """
+        async with self.released:
+            while (
+                not self.exhausted()
+                and self.max_documents is not None
+                and self.documents + self.reserved >= self.max_documents
+            ):
+                await self.released.wait()
+            if self.exhausted():
+                return False
+            self.reserved += 1
+            return True
+
+    async def release(self, imported: bool = False):
+        """Return the document claimed by reserve
+        @parameter imported : bool - The item imported a document, count it
+        """
+        async with self.released:
+            self.reserved -= 1
+            if imported:
+                self.documents += 1
+            self.released.notify_all()
+
+    def charge(self, documents: int = 0, bytes: int = 0, api_calls: int = 0):
+        self.documents += documents
+        self.bytes += bytes
+        self.api_calls += api_calls
+
+    def changed(self, key: str, version: str = None) -> bool:
+        """@returns bool - Whether an item is new or its version differs from the previous run"""
+        return version is None or self.previous_versions.get(key) != version
+
+    def prioritize(self, items: list, key, version=None, depth=None) -> list:
+        """Order items so the most valuable ones are processed first
+        New and changed items come first, then shallower paths. Ties keep
+        their original order (e.g. newest first for videos).
+        @parameter items : list - Work items
+        @parameter key : Callable - Returns the identifier of an item
+        @parameter version : Callable - Returns the version of an item (e.g. a blob sha), None if unknown
+        @parameter depth : Callable - Returns the path depth of an item
+        @returns list - The reordered items
+        """
+        return sorted(
+            items,
+            key=lambda item: (
+                not self.changed(key(item), version(item) if version else None),
+                depth(item) if depth else 0,
+            ),
+        )
+
+    def done(self, key: str, version: str = None):
+        """Record a fully processed item"""
+        if version is not None:
+            self.versions[key] = version
+
+    def leave(self, key: str):
+        """Record an item that was not processed because the budget ran out"""
+        self.remaining.append(key)
+
+
+def path_depth(path: str) -> int:
+    """@returns int - Number of path components of a file path or URL path"""
+    return len([part for part in path.split("/") if part])
+
+
+class Scheduler:
+    """Hands out per-source budgets under one deadline and stores where each source stopped"""
+
+    def __init__(
+        self, deadline: float = None, path: str = "schedule_state.db", started_at: float = None
+    ):
+        """
+        @parameter deadline : float - Unix time after which no new item is started
+        @parameter path : str - SQLite file holding item versions and checkpoints
+        @parameter started_at : float - Unix time the run started, shared by all shards of a run
+        """
+        self.deadline = deadline
+        self.started_at = started_at or time.time()
+        self.budgets = {}
+        # Shards running in separate processes write to the same file
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS versions (
+                source TEXT NOT NULL,
+                item TEXT NOT NULL,
+                version TEXT NOT NULL,
+                PRIMARY KEY (source, item)
+            )
+            """
+        )
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS checkpoints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                stopped TEXT,
+                documents INTEGER NOT NULL,
+                bytes INTEGER NOT NULL,
+                api_calls INTEGER NOT NULL,
+                remaining TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            )
+            """
+        )
+        self.connection.commit()
+
+    def budget(
+        self,
+        source: str,
+        documents: int = None,
+        bytes: int = None,
+        api_calls: int = None,
+    ) -> SourceBudget:
+        """Create the budget of a source
+        @parameter source : str - Source name, identifies its recorded versions
+        @parameter documents : int - Maximum number of imported documents
+        @parameter bytes : int - Maximum number of downloaded bytes
+        @parameter api_calls : int - Maximum number of HTTP/API requests
+        @returns SourceBudget - The budget to pass to the source
+        """
+        versions = dict(
+            self.connection.execute(
+                "SELECT item, version FROM versions WHERE source = ?", (source,)
+            ).fetchall()
+        )
+        budget = SourceBudget(self.deadline, documents, bytes, api_calls, versions)
+        self.budgets.setdefault(source, []).append(budget)
+        return budget
+
+    def save(self) -> dict:
+        """Store the processed item versions and a checkpoint per source
+        @returns dict - Reason each source stopped early, None if it finished
+        """
+        stopped = {}
+        now = time.time()
+        for source, budgets in self.budgets.items():
+            for budget in budgets:
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO versions (source, item, version) VALUES (?, ?, ?)",
+                    [(source, item, version) for item, version in budget.versions.items()],
+                )
+                self.connection.execute(
+                    """
+                    INSERT INTO checkpoints (
+                        source, started_at, stopped, documents, bytes, api_calls,
+                        remaining, finished_at
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        source,
+                        self.started_at,
+                        budget.stopped,
+                        budget.documents,
+                        budget.bytes,
+                        budget.api_calls,
+                        json.dumps(budget.remaining),
+                        now,
+                    ),
+                )
+                stopped[source] = stopped.get(source) or budget.stopped
+        self.connection.commit()
+        return stopped
+
+    def last_checkpoint(self, source: str) -> dict | None:
+        """Merge the checkpoints every shard of the latest run wrote for a source
+        @returns dict | None - The latest checkpoint of a source, None if it never ran
+        """
+        rows = self.connection.execute(
+            """
+            SELECT stopped, documents, bytes, api_calls, remaining, finished_at
+            FROM checkpoints WHERE source = ? AND started_at = (
+                SELECT MAX(started_at) FROM checkpoints WHERE source = ?
+            )
+            ORDER BY id
+            """,
+            (source, source),
+        ).fetchall()
+        if not rows:
+            return None
+        checkpoint = {
+            "stopped": None,
+            "documents": 0,
+            "bytes": 0,
+            "api_calls": 0,
+            "remaining": [],
+            "finished_at": 0,
+        }
+        for stopped, documents, bytes, api_calls, remaining, finished_at in rows:
+            checkpoint["stopped"] = checkpoint["stopped"] or stopped
+            checkpoint["documents"] += documents
+            checkpoint["bytes"] += bytes
+            checkpoint["api_calls"] += api_calls
+            checkpoint["remaining"] += json.loads(remaining)
+            checkpoint["finished_at"] = max(checkpoint["finished_at"], finished_at)
+        return checkpoint
+
+    def close(self):
+        self.connection.close()
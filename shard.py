@@ -0,0 +1,148 @@
+import asyncio
+import copy
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from wasabi import msg  # type: ignore[import]
+
+from ingest import connect_and_ingest
+from sources import LISTERS
+
+
+async def list_work(config: dict) -> list:
+    """List the work items of every source of a config
+    @parameter config : dict - Validated ingestion config
+    @returns list - Items per source, None for sources without a lister
+    """
+    work = []
+    for source in config["sources"]:
+        lister = LISTERS.get(source["name"])
+        if lister is None:
+            work.append(None)
+            continue
+        items = await lister(**source["params"])
+        msg.info(f"Found {len(items)} items for {source['name']}")
+        work.append(items)
+    return work
+
+
+def split_config(config: dict, work: list, shards: int) -> list[dict]:
+    """Split a config into one config per shard
+    Items are dealt round-robin, so neighbouring (often similarly sized) items
+    end up in different shards, and the budgets of a source are divided
+    between its shards. Sources that cannot be listed run in shard 0.
+    @parameter config : dict - Validated ingestion config
+    @parameter work : list - Items per source as returned by list_work
+    @parameter shards : int - Number of shards
+    @returns list[dict] - One ingestion config per shard
+    """
+    shard_configs = [copy.deepcopy(config) for _ in range(shards)]
+    for shard_config in shard_configs:
+        shard_config["sources"] = []
+
+    for source, items in zip(config["sources"], work):
+        # Shard copies of this config entry, entries may share a source name
+        shard_sources = []
+        for shard, shard_config in enumerate(shard_configs):
+            if items is None:
+                if shard > 0:
+                    continue
+                shard_source = copy.deepcopy(source)
+            else:
+                shard_items = items[shard::shards]
+                if not shard_items:
+                    continue
+                shard_source = copy.deepcopy(source)
+                shard_source["params"]["items"] = shard_items
+            shard_sources.append(shard_source)
+            shard_config["sources"].append(shard_source)
+
+        for shard_source in shard_sources:
+            shard_source["budget"] = {
+                key: math.ceil(limit / len(shard_sources))
+                for key, limit in source["budget"].items()
+            }
+    return shard_configs
+
+
+def merge_stats(stats: list[dict]) -> dict:
+    """Merge the stats of several ingestion runs
+    @parameter stats : list[dict] - Stats as returned by run_ingestion
+    @returns dict - Summed counts, all errors and the slowest wall time per source
+    """
+    merged = {
+        "imported": 0,
+        "skipped": 0,
+        "failed": 0,
+        "errors": [],
+        "sources": {},
+        "stopped": {},
+    }
+    for shard_stats in stats:
+        merged["imported"] += shard_stats["imported"]
+        merged["skipped"] += shard_stats["skipped"]
+        merged["failed"] += shard_stats["failed"]
+        merged["errors"] += shard_stats["errors"]
+        merged["stopped"].update(shard_stats["stopped"])
+        for name, seconds in shard_stats["sources"].items():
+            if name in merged["sources"] and merged["sources"][name] is None:
+                continue
+            if seconds is None or name not in merged["sources"]:
+                merged["sources"][name] = seconds
+            else:
+                merged["sources"][name] = max(merged["sources"][name], seconds)
+    return merged
+
+
+def run_shard(config: dict) -> dict:
+    """Entry point of a worker process, runs one shard with its own client and event loop
+    @parameter config : dict - Ingestion config of the shard
+    @returns dict - Stats of the shard
+    """
+    import run_pipeline  # noqa: F401 registers the sources in this process
+
+    return asyncio.run(connect_and_ingest(config))
+
+
+def run_sharded(config: dict, workers: int) -> dict:
+    """Split the work of a config across worker processes and merge their stats
+    @parameter config : dict - Validated ingestion config
+    @parameter workers : int - Number of worker processes
+    @returns dict - Merged stats of all shards
+    """
+    work = asyncio.run(list_work(config))
+    shard_configs = [
+        shard_config
+        for shard_config in split_config(config, work, workers)
+        if shard_config["sources"]
+    ]
+    msg.divider(f"Running {len(shard_configs)} shards")
+
+    stats = []
+    with ProcessPoolExecutor(max_workers=len(shard_configs) or 1) as pool:
+        futures = {
+            pool.submit(run_shard, shard_config): shard
+            for shard, shard_config in enumerate(shard_configs)
+        }
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                shard_stats = future.result()
+            except Exception as e:
+                msg.fail(f"Shard {shard} failed: {e}")
+                shard_stats = {
+                    "imported": 0,
+                    "skipped": 0,
+                    "failed": 0,
+                    "errors": [f"Shard {shard}: {e}"],
+                    "sources": {},
+                    "stopped": {},
+                }
+            stats.append(shard_stats)
+            msg.info(
+                f"Shard {shard} done: {shard_stats['imported']} imported, "
+                f"{shard_stats['skipped']} skipped, {shard_stats['failed']} failed "
+                f"({len(stats)}/{len(shard_configs)} shards)"
+            )
+
+    return merge_stats(stats)
@@ -0,0 +1,52 @@
+SOURCES = {}
+
+
+def register_source(name: str, description: str = ""):
+    """Register an async ingestion source under a name
+    Sources should import their heavy dependencies inside the function body,
+    so that only the sources selected for a run pay for them.
+    @parameter name : str - Name used to select the source (e.g. on the command line)
+    @parameter description : str - Short description shown in the CLI help
+    @returns Callable - Decorator registering the source function
+    """
+
+    def decorator(func):
+        func.source_name = name
+        func.source_description = description
+        SOURCES[name] = func
+        return func
+
+    return decorator
+
+
+def get_sources(names: list[str]) -> list:
+    """Resolve source names to their registered functions
+    @parameter names : list[str] - Names of the sources to run
+    @returns list - The source functions, in the given order
+    """
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise ValueError(
+            f"Unknown sources {', '.join(unknown)}, available: {', '.join(SOURCES)}"
+        )
+    return [SOURCES[name] for name in names]
+
+
+LISTERS = {}
+
+
+def register_lister(name: str):
+    """Register an async function listing the work items of a source
+    The lister takes the source parameters as keyword arguments and returns a
+    picklable list of items. Passing a subset of them as the `items` parameter
+    of the source makes it process only that subset, which is what allows
+    splitting a source across processes.
+    @parameter name : str - Name of the registered source the items belong to
+    @returns Callable - Decorator registering the lister
+    """
+
+    def decorator(func):
+        LISTERS[name] = func
+        return func
+
+    return decorator
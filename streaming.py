@@ -0,0 +1,37 @@
+CHUNK_SIZE = 64 * 1024
+
+# Largest document body read into memory unless a source is configured otherwise
+DEFAULT_MAX_DOCUMENT_BYTES = 10 * 1024 * 1024
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when a response body exceeds the maximum document size"""
+
+    def __init__(self, url: str, max_bytes: int):
+        super().__init__(f"{url} is larger than {max_bytes} bytes")
+        self.url = url
+        self.max_bytes = max_bytes
+
+
+async def read_body(response, max_bytes: int = None) -> bytearray:
+    """Read an aiohttp response body in chunks, refusing bodies over a size limit
+    The Content-Length header is checked first, so oversized bodies announced
+    by the server are never downloaded; chunked bodies are cut off as soon as
+    they cross the limit.
+    @parameter response : aiohttp.ClientResponse - The response to read
+    @parameter max_bytes : int - Maximum body size, None for no limit
+    @returns bytearray - The body
+    """
+    if (
+        max_bytes is not None
+        and response.content_length is not None
+        and response.content_length > max_bytes
+    ):
+        raise DocumentTooLarge(str(response.url), max_bytes)
+
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        body.extend(chunk)
+        if max_bytes is not None and len(body) > max_bytes:
+            raise DocumentTooLarge(str(response.url), max_bytes)
+    return body
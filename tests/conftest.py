@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from aiohttp import web
+
+# The pipeline modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeWeaviateManager:
+    """Document lookups and deletions of the VerbaManager, on a dict keyed by document name"""
+
+    def __init__(self, documents: dict):
+        self.documents = documents
+
+    async def exist_document_name(self, client, name):
+        return name if name in self.documents else None
+
+    async def delete_document(self, client, uuid):
+        del self.documents[uuid]
+
+
+class FakeManager:
+    """VerbaManager storing imported documents by name, imports of sources in `fail` raise"""
+
+    def __init__(self):
+        self.documents = {}
+        self.imports = 0
+        self.fail = set()
+        # Seconds every import takes
+        self.delay = 0
+        self.weaviate_manager = FakeWeaviateManager(self.documents)
+
+    async def import_document(self, client, file_config):
+        await asyncio.sleep(self.delay)
+        if file_config.source in self.fail:
+            raise RuntimeError("import failed")
+        self.imports += 1
+        self.documents[file_config.filename] = file_config.content
+
+
+@pytest.fixture
+def manager() -> FakeManager:
+    return FakeManager()
+
+
+class LocalSite:
+    """Documentation pages served by a local aiohttp server
+
+    The index page at /developers/weaviate links to every page in `pages`,
+    pages in `status` answer with that HTTP status and an error page.
+    """
+
+    def __init__(self):
+        self.pages = ["p0", "p1", "p2"]
+        self.version = 1
+        self.status = {}
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.base_url = None
+
+    def url(self, page: str) -> str:
+        return f"{self.base_url}/{page}"
+
+    async def index(self, request):
+        links = "".join(
+            f'<a href="/developers/weaviate/{page}">{page}</a>' for page in self.pages
+        )
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    async def page(self, request):
+        page = request.match_info["page"]
+        if page in self.status:
+            return web.Response(
+                status=self.status[page],
+                text="<h1>Unavailable</h1>" + "Please try again later. " * 100,
+                content_type="text/html",
+            )
+        if page not in self.pages:
+            raise web.HTTPNotFound()
+        return web.Response(
+            text=(
+                f"<html><body><nav>Menu</nav><h1>{page} v{self.version}</h1>"
+                f"<p>{'content ' * 300}</p></body></html>"
+            ),
+            content_type="text/html",
+        )
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def start(self):
+        app = web.Application()
+        app.router.add_get("/developers/weaviate", self.index)
+        app.router.add_get("/developers/weaviate/{page}", self.page)
+        self.thread.start()
+        self.runner = web.AppRunner(app)
+        self.run(self.runner.setup())
+        self.run(web.TCPSite(self.runner, "127.0.0.1", 0).start())
+        host, port = self.runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}/developers/weaviate"
+
+    def stop(self):
+        self.run(self.runner.cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def site() -> LocalSite:
+    site = LocalSite()
+    site.start()
+    yield site
+    site.stop()
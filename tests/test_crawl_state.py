@@ -0,0 +1,114 @@
+import pytest
+
+from crawl_state import BloomFilter, CrawlState, normalize_url, url_depth, url_fingerprint
+
+BASE_URL = "https://weaviate.io/developers/weaviate"
+PAGES = [f"{BASE_URL}/p{i}" for i in range(3)]
+
+
+@pytest.mark.parametrize(
+    "url, normalized",
+    [
+        ("https://weaviate.io/developers/weaviate/", BASE_URL),
+        ("HTTPS://Weaviate.IO:443/developers//weaviate", BASE_URL),
+        ("https://weaviate.io/developers/weaviate#search", BASE_URL),
+        ("https://weaviate.io/developers/weaviate?tab=python", BASE_URL),
+        ("https://weaviate.io:8443/developers", "https://weaviate.io:8443/developers"),
+        ("https://weaviate.io", "https://weaviate.io/"),
+    ],
+)
+def test_normalize_url(url, normalized):
+    assert normalize_url(url) == normalized
+
+
+def test_normalize_url_keeps_sorted_query():
+    assert normalize_url(f"{BASE_URL}?b=2&a=1", keep_query=True) == f"{BASE_URL}?a=1&b=2"
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [url_fingerprint(f"{BASE_URL}/{i}") for i in range(1000)]
+    for fingerprint in added:
+        bloom.add(fingerprint)
+    assert all(fingerprint in bloom for fingerprint in added)
+
+    others = [url_fingerprint(f"{BASE_URL}/other/{i}") for i in range(10000)]
+    false_positives = sum(fingerprint in bloom for fingerprint in others)
+    assert false_positives < 10000 * 0.03
+
+
+def test_push_skips_known_urls():
+    state = CrawlState(":memory:")
+    assert state.push(BASE_URL)
+    assert not state.push(f"{BASE_URL}/")
+    assert state.push_many([PAGES[0], PAGES[0], f"{PAGES[1]}#top"]) == 2
+    assert state.seen(f"{PAGES[1]}/")
+    assert not state.seen(PAGES[2])
+    state.close()
+
+
+def test_pop_returns_shallow_pages_first():
+    state = CrawlState(":memory:")
+    deep = f"{BASE_URL}/concepts/search/hybrid"
+    state.push_many([deep, PAGES[1], "https://weaviate.io/developers", PAGES[0]])
+    popped = []
+    while (url := state.pop()) is not None:
+        popped.append(url)
+        state.done(url)
+    assert popped == ["https://weaviate.io/developers", PAGES[1], PAGES[0], deep]
+    assert [url_depth(url) for url in popped] == [1, 3, 3, 5]
+    state.close()
+
+
+def test_interrupted_crawl_resumes(tmp_path):
+    path = str(tmp_path / "crawl.db")
+    state = CrawlState(path)
+    state.push_many(PAGES)
+    state.done(PAGES[0])
+    state.close()
+
+    state = CrawlState(path)
+    assert state.seen(PAGES[0])
+    assert state.pending() == 2
+    assert state.pop() == PAGES[1]
+    state.close()
+
+
+def test_requeue_puts_a_page_back():
+    state = CrawlState(":memory:")
+    state.push(PAGES[0])
+    state.done(PAGES[0])
+    assert state.pop() is None
+    state.requeue(PAGES[0])
+    assert state.pop() == PAGES[0]
+    state.close()
+
+
+def test_begin_restarts_finished_crawl(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.db"))
+    assert state.begin()
+    state.push(BASE_URL)
+    state.done(BASE_URL)
+    state.push(PAGES[0])
+
+    # Interrupted with a page pending, resume it
+    assert not state.begin()
+    assert state.pop() == PAGES[0]
+
+    # Frontier exhausted, start over
+    state.done(PAGES[0])
+    assert state.begin()
+    assert not state.seen(BASE_URL)
+    state.close()
+
+
+def test_failed_pages_are_tracked(tmp_path):
+    state = CrawlState(str(tmp_path / "crawl.db"))
+    state.push_many(PAGES)
+    state.done(PAGES[0])
+    state.done(PAGES[1], failed=True)
+    assert state.failed() == [PAGES[1]]
+    assert state.pending() == 1
+    state.begin(resume=False)
+    assert state.failed() == []
+    state.close()
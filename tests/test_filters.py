@@ -0,0 +1,64 @@
+import pytest
+
+from filters import CONTENT, PATH, SIZE, FilterPipeline
+
+
+@pytest.fixture
+def filters() -> FilterPipeline:
+    return (
+        FilterPipeline("Test")
+        .add(PATH, "drafts", lambda path: not path.startswith("drafts/"))
+        .add(SIZE, "min_size", lambda size: size >= 10)
+        .add(SIZE, "max_size", lambda size: size <= 100)
+        .add(CONTENT, "min_length", lambda text: len(text) >= 5)
+    )
+
+
+def test_rules_of_a_stage(filters):
+    assert filters.accept(PATH, "docs/a.md")
+    assert not filters.accept(PATH, "drafts/a.md")
+    assert filters.accept(SIZE, 50)
+    assert not filters.accept(SIZE, 5)
+    assert not filters.accept(SIZE, 500)
+    assert filters.accept(CONTENT, "hello")
+    assert not filters.accept(CONTENT, "hi")
+
+
+def test_unknown_size_is_left_to_the_content_rules(filters):
+    assert filters.accept(SIZE, None)
+    assert filters.checked[SIZE] == 0
+
+
+def test_counts(filters):
+    filters.accept(PATH, "docs/a.md")
+    filters.accept(PATH, "drafts/a.md")
+    filters.accept(SIZE, 5)
+    filters.accept(SIZE, 500)
+    filters.accept(SIZE, 2)
+    assert filters.checked == {PATH: 2, SIZE: 3}
+    assert filters.rejections == {"drafts": 1, "min_size": 2, "max_size": 1}
+
+
+def test_first_rejection_stops_the_stage():
+    calls = []
+    filters = (
+        FilterPipeline()
+        .add(PATH, "first", lambda path: calls.append("first") or False)
+        .add(PATH, "second", lambda path: calls.append("second") or True)
+    )
+    assert not filters.accept(PATH, "a.md")
+    assert calls == ["first"]
+
+
+def test_unknown_stage_is_rejected():
+    with pytest.raises(ValueError):
+        FilterPipeline().add("body", "rule", lambda value: True)
+
+
+def test_report(filters, capsys):
+    filters.accept(PATH, "drafts/a.md")
+    filters.accept(CONTENT, "hello")
+    filters.report()
+    output = capsys.readouterr().out
+    assert "checked 1 by path, 1 by content" in output
+    assert "rejected 1 documents (drafts: 1)" in output
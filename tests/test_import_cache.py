@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+
+from import_state import ImportCache
+from ingest import ImportQueue
+
+
+def document(name: str, content: str = "content") -> SimpleNamespace:
+    return SimpleNamespace(
+        filename=name,
+        source=f"https://weaviate.io/{name}",
+        labels=["Documentation"],
+        content=content,
+    )
+
+
+def run_imports(manager, cache, documents) -> ImportQueue:
+    async def run():
+        queue = ImportQueue(manager, cache=cache)
+        for file_config in documents:
+            await queue.import_document(None, file_config)
+        await queue.close()
+        return queue
+
+    return asyncio.run(run())
+
+
+def test_identical_document_is_skipped(manager):
+    cache = ImportCache(":memory:")
+    run_imports(manager, cache, [document("page")])
+    queue = run_imports(manager, cache, [document("page")])
+    assert manager.imports == 1
+    assert queue.skipped == 1
+
+
+def test_renamed_document_is_imported(manager):
+    cache = ImportCache(":memory:")
+    run_imports(manager, cache, [document("old_name")])
+    run_imports(manager, cache, [document("new_name")])
+    assert set(manager.documents) == {"old_name", "new_name"}
+
+
+def test_document_missing_from_weaviate_is_imported(manager):
+    cache = ImportCache(":memory:")
+    run_imports(manager, cache, [document("page")])
+    manager.documents.clear()
+    queue = run_imports(manager, cache, [document("page")])
+    assert manager.imports == 2
+    assert queue.skipped == 0
+    assert "page" in manager.documents
+
+
+def test_reverted_document_is_imported(manager):
+    cache = ImportCache(":memory:")
+    run_imports(manager, cache, [document("page", "A")])
+    run_imports(manager, cache, [document("page", "B")])
+    queue = run_imports(manager, cache, [document("page", "A")])
+    assert queue.skipped == 0
+    assert manager.documents["page"] == "A"
+
+
+def test_rag_config_change_misses_the_cache(manager, tmp_path):
+    path = str(tmp_path / "cache.db")
+    run_imports(manager, ImportCache(path, {"Chunker": "Token"}), [document("page")])
+    run_imports(manager, ImportCache(path, {"Chunker": "Token"}), [document("page")])
+    assert manager.imports == 1
+
+    cache = ImportCache(path, {"Chunker": "Sentence"})
+    # Entries of the old config are purged when the cache is opened
+    assert cache.connection.execute("SELECT COUNT(*) FROM imports").fetchone()[0] == 0
+    run_imports(manager, cache, [document("page")])
+    assert manager.imports == 2
+
+
+def test_skipped_document_reports_false(manager):
+    cache = ImportCache(":memory:")
+    run_imports(manager, cache, [document("page")])
+
+    async def run():
+        queue = ImportQueue(manager, cache=cache)
+        result = await queue.import_document(None, document("page"))
+        await queue.close()
+        return result
+
+    assert asyncio.run(run()) is False
@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+import pytest
+
+from ingest import ConcurrencyLimiter, load_ingest_config, validate_ingest_config
+
+
+def test_defaults_are_filled_in():
+    config = validate_ingest_config({"deadline_minutes": 10})
+    assert config["concurrency"] == 8
+    assert config["import_workers"] == 1
+    assert config["sources"] == []
+    assert "deadline_minutes" not in config
+    assert 590 < config["deadline"] - time.time() <= 600
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"concurrency": 0},
+        {"import_workers": 0},
+        {"sources": [{"name": "docs", "concurrency": 0}]},
+        {"unknown": 1},
+        {"sources": [{"name": "docs", "budget": {"pages": 1}}]},
+        {"sources": [{"concurrency": 1}]},
+    ],
+)
+def test_invalid_configs_are_rejected(config):
+    with pytest.raises(ValueError):
+        validate_ingest_config(config)
+
+
+def test_load_ingest_config_applies_overrides(tmp_path):
+    path = tmp_path / "ingest.toml"
+    path.write_text('concurrency = 4\nimport_cache = "cache.db"\n')
+    config = load_ingest_config(str(path), import_cache="")
+    assert config["concurrency"] == 4
+    assert config["import_cache"] == ""
+
+
+def test_child_limiter_shares_the_parent_cap():
+    async def run():
+        parent = ConcurrencyLimiter(2)
+        children = [parent.child(2), parent.child(2)]
+        running = peak = 0
+
+        async def work(limiter):
+            nonlocal running, peak
+            async with limiter:
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work(child) for child in children for _ in range(3)))
+        return peak
+
+    assert asyncio.run(run()) == 2
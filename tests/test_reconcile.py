@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+
+from import_state import ImportState
+
+
+@pytest.fixture
+def run_pipeline():
+    pytest.importorskip("goldenverba")
+    import run_pipeline
+
+    return run_pipeline
+
+
+def scrape(run_pipeline, site, tmp_path, manager, **kwargs):
+    asyncio.run(
+        run_pipeline.scrape_documentation(
+            None,
+            manager,
+            {},
+            crawl_state_path=str(tmp_path / "crawl.db"),
+            import_state_path=str(tmp_path / "import.db"),
+            reconcile=True,
+            base_url=site.base_url,
+            crawl_delay=0,
+            **kwargs,
+        )
+    )
+
+
+def documents(manager) -> dict[str, str]:
+    """@returns dict[str, str] - Content of the imported documents by page name"""
+    return {name.rsplit("_", 1)[-1]: content for name, content in manager.documents.items()}
+
+
+def imported_sources(tmp_path) -> set[str]:
+    state = ImportState(str(tmp_path / "import.db"))
+    sources = {source for (source,) in state.connection.execute("SELECT source FROM documents")}
+    state.close()
+    return sources
+
+
+def test_removed_page_is_deleted(run_pipeline, site, manager, tmp_path):
+    scrape(run_pipeline, site, tmp_path, manager)
+    assert set(documents(manager)) == {"p0", "p1", "p2"}
+
+    site.pages.remove("p1")
+    scrape(run_pipeline, site, tmp_path, manager)
+    assert set(documents(manager)) == {"p0", "p2"}
+    assert imported_sources(tmp_path) == {site.url("p0"), site.url("p2")}
+
+
+@pytest.mark.parametrize("failure", ["503", "429", "convert", "import"])
+def test_failed_page_is_not_deleted(run_pipeline, site, manager, tmp_path, monkeypatch, failure):
+    scrape(run_pipeline, site, tmp_path, manager)
+
+    # Changed content, so every page is imported again
+    site.version += 1
+    if failure in ("503", "429"):
+        site.status["p1"] = int(failure)
+    elif failure == "convert":
+        import retrieve_html_to_text
+
+        html_to_markdown = retrieve_html_to_text.html_to_markdown
+
+        def failing_html_to_markdown(html):
+            if "p1 v" in html:
+                raise ValueError("unparsable page")
+            return html_to_markdown(html)
+
+        monkeypatch.setattr(retrieve_html_to_text, "html_to_markdown", failing_html_to_markdown)
+    else:
+        manager.fail.add(site.url("p1"))
+    scrape(run_pipeline, site, tmp_path, manager)
+
+    assert set(documents(manager)) == {"p0", "p1", "p2"}
+    assert "p1 v1" in documents(manager)["p1"]
+    assert "p0 v2" in documents(manager)["p0"]
+    assert site.url("p1") in imported_sources(tmp_path)
+
+
+def test_stopped_crawl_deletes_nothing(run_pipeline, site, manager, tmp_path):
+    scrape(run_pipeline, site, tmp_path, manager)
+
+    site.pages.remove("p1")
+    scrape(
+        run_pipeline,
+        site,
+        tmp_path,
+        manager,
+        budget=run_pipeline.SourceBudget(deadline=time.time() - 1),
+    )
+    assert set(documents(manager)) == {"p0", "p1", "p2"}
+
+
+def test_pages_left_by_budget_are_imported_on_resume(run_pipeline, site, manager, tmp_path):
+    # The next page is already crawled and waiting while the first one imports
+    manager.delay = 0.05
+    scrape(
+        run_pipeline,
+        site,
+        tmp_path,
+        manager,
+        limiter=run_pipeline.ConcurrencyLimiter(2),
+        budget=run_pipeline.SourceBudget(max_documents=1),
+    )
+    assert set(documents(manager)) == {"p0"}
+
+    scrape(run_pipeline, site, tmp_path, manager)
+    assert set(documents(manager)) == {"p0", "p1", "p2"}
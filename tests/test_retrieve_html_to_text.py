@@ -0,0 +1,58 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from crawl_state import CrawlState
+from retrieve_html_to_text import recursive_get_hrefs
+
+
+def crawl(site, state: CrawlState) -> list[tuple[str, str]]:
+    async def run():
+        return [
+            page
+            async for page in recursive_get_hrefs(
+                site.base_url, state=state, with_html=True, delay=0
+            )
+        ]
+
+    return asyncio.run(run())
+
+
+def test_crawler_yields_pages_with_html(site):
+    state = CrawlState(":memory:")
+    pages = dict(crawl(site, state))
+    assert list(pages) == [site.base_url, site.url("p0"), site.url("p1"), site.url("p2")]
+    assert "p1 v1" in pages[site.url("p1")]
+    assert state.failed() == []
+
+
+def test_crawler_records_error_status_as_failed(site):
+    site.status["p1"] = 503
+    state = CrawlState(":memory:")
+    pages = dict(crawl(site, state))
+    assert site.url("p1") not in pages
+    assert state.failed() == [site.url("p1")]
+    assert state.pending() == 0
+
+
+def test_relative_links_resolve_against_the_fetched_url():
+    async def redirect(request):
+        raise web.HTTPFound("/developers/concepts/")
+
+    async def section(request):
+        return web.Response(text='<a href="search">Search</a>', content_type="text/html")
+
+    async def run():
+        app = web.Application()
+        # Like Docusaurus, section pages live at a URL with a trailing slash
+        app.router.add_get("/developers/concepts", redirect)
+        app.router.add_get("/developers/concepts/", section)
+        app.router.add_get("/developers/concepts/search", section)
+        async with TestServer(app) as server:
+            base_url = str(server.make_url("/developers/concepts"))
+            urls = [url async for url in recursive_get_hrefs(base_url, delay=0)]
+        return base_url, urls
+
+    base_url, urls = asyncio.run(run())
+    assert urls == [base_url, f"{base_url}/search"]
@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+from scheduler import Scheduler, SourceBudget, path_depth
+
+
+def test_prioritize_puts_changed_then_shallow_items_first():
+    budget = SourceBudget(versions={"a/b/unchanged.md": "1", "a/changed.md": "1"})
+    items = [
+        ("a/b/unchanged.md", "1"),
+        ("a/changed.md", "2"),
+        ("a/b/c/new.md", "1"),
+        ("top.md", "1"),
+    ]
+    ordered = budget.prioritize(
+        items,
+        key=lambda item: item[0],
+        version=lambda item: item[1],
+        depth=lambda item: path_depth(item[0]),
+    )
+    assert [path for path, _ in ordered] == [
+        "top.md",
+        "a/changed.md",
+        "a/b/c/new.md",
+        "a/b/unchanged.md",
+    ]
+
+
+def test_prioritize_keeps_order_of_ties():
+    assert SourceBudget().prioritize([3, 1, 2], key=str) == [3, 1, 2]
+
+
+@pytest.mark.parametrize(
+    "budget, charge, reason",
+    [
+        (SourceBudget(deadline=time.time() - 1), {}, "deadline"),
+        (SourceBudget(max_bytes=10), {"bytes": 10}, "bytes"),
+        (SourceBudget(max_api_calls=2), {"api_calls": 2}, "api_calls"),
+        (SourceBudget(max_documents=1), {"documents": 1}, "documents"),
+    ],
+)
+def test_exhausted(budget, charge, reason):
+    budget.charge(**{key: value - 1 for key, value in charge.items()})
+    if charge:
+        assert not budget.exhausted()
+        budget.charge(**charge)
+    assert budget.exhausted()
+    assert budget.stopped == reason
+
+
+def test_setdefault_keeps_configured_limits():
+    budget = SourceBudget(max_documents=5)
+    budget.setdefault(max_documents=100, max_bytes=10)
+    assert (budget.max_documents, budget.max_bytes, budget.max_api_calls) == (5, 10, None)
+
+
+def run_items(budget: SourceBudget, imports: list[bool], concurrency: int) -> list[int]:
+    """Run items through the budget concurrently
+    @returns list[int] - Indices of the items that started
+    """
+    started = []
+
+    async def item(index: int, imported: bool):
+        if not await budget.reserve():
+            return
+        started.append(index)
+        await asyncio.sleep(0.01)
+        await budget.release(imported)
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited(index, imported):
+            async with semaphore:
+                await item(index, imported)
+
+        await asyncio.gather(*(limited(i, imported) for i, imported in enumerate(imports)))
+
+    asyncio.run(run())
+    return started
+
+
+def test_concurrent_items_do_not_overshoot_max_documents():
+    budget = SourceBudget(max_documents=3)
+    run_items(budget, [True] * 10, concurrency=8)
+    assert budget.documents == 3
+    assert budget.stopped == "documents"
+
+
+def test_items_that_import_nothing_do_not_use_the_budget():
+    budget = SourceBudget(max_documents=2)
+    started = run_items(budget, [False, False, True, False, True, True], concurrency=4)
+    assert budget.documents == 2
+    assert started == [0, 1, 2, 3, 4]
+    assert budget.reserved == 0
+
+
+def test_save_records_versions_for_the_next_run(tmp_path):
+    path = str(tmp_path / "schedule.db")
+    scheduler = Scheduler(path=path)
+    budget = scheduler.budget("blog")
+    budget.done("post.md", "sha1")
+    budget.charge(documents=1)
+    assert scheduler.save() == {"blog": None}
+    scheduler.close()
+
+    scheduler = Scheduler(path=path)
+    budget = scheduler.budget("blog")
+    assert not budget.changed("post.md", "sha1")
+    assert budget.changed("post.md", "sha2")
+    assert scheduler.last_checkpoint("blog")["documents"] == 1
+    assert scheduler.last_checkpoint("docs") is None
+    scheduler.close()
+
+
+def test_last_checkpoint_merges_the_shards_of_the_latest_run(tmp_path):
+    path = str(tmp_path / "schedule.db")
+    for started_at, remaining in [(1.0, [["old"]]), (2.0, [["a"], ["b", "c"]])]:
+        # Every shard runs its own scheduler on the shared file
+        for shard_remaining in remaining:
+            scheduler = Scheduler(deadline=time.time() - 1, path=path, started_at=started_at)
+            budget = scheduler.budget("blog")
+            budget.exhausted()
+            budget.charge(documents=1)
+            for item in shard_remaining:
+                budget.leave(item)
+            scheduler.save()
+            scheduler.close()
+
+    scheduler = Scheduler(path=path)
+    checkpoint = scheduler.last_checkpoint("blog")
+    assert checkpoint["stopped"] == "deadline"
+    assert checkpoint["documents"] == 2
+    assert checkpoint["remaining"] == ["a", "b", "c"]
+    scheduler.close()
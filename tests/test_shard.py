@@ -0,0 +1,70 @@
+from shard import merge_stats, split_config
+
+
+def source(name: str, budget: dict = None, **params) -> dict:
+    return {"name": name, "concurrency": 8, "budget": budget or {}, "params": params}
+
+
+def test_items_are_dealt_round_robin():
+    config = {"concurrency": 8, "sources": [source("blog")]}
+    shard_configs = split_config(config, [list(range(5))], 2)
+    assert [c["sources"][0]["params"]["items"] for c in shard_configs] == [[0, 2, 4], [1, 3]]
+    # The original config is left alone
+    assert "items" not in config["sources"][0]["params"]
+
+
+def test_unlisted_sources_run_in_shard_0():
+    config = {"sources": [source("docs", {"documents": 10}), source("blog")]}
+    shard_configs = split_config(config, [None, [1, 2]], 2)
+    assert [s["name"] for s in shard_configs[0]["sources"]] == ["docs", "blog"]
+    assert [s["name"] for s in shard_configs[1]["sources"]] == ["blog"]
+    assert shard_configs[0]["sources"][0]["budget"] == {"documents": 10}
+
+
+def test_budgets_are_split_per_config_entry():
+    config = {
+        "sources": [
+            source("github", {"documents": 100}, folder_path="a/"),
+            source("github", {"documents": 10}, folder_path="b/"),
+        ]
+    }
+    shard_configs = split_config(config, [[1, 2], [3, 4]], 2)
+    for shard_config in shard_configs:
+        budgets = {s["params"]["folder_path"]: s["budget"] for s in shard_config["sources"]}
+        assert budgets == {"a/": {"documents": 50}, "b/": {"documents": 5}}
+
+
+def test_budgets_round_up_and_skip_empty_shards():
+    config = {"sources": [source("videos", {"documents": 5})]}
+    shard_configs = split_config(config, [[1, 2]], 3)
+    assert [len(c["sources"]) for c in shard_configs] == [1, 1, 0]
+    assert shard_configs[0]["sources"][0]["budget"] == {"documents": 3}
+
+
+def stats(imported=0, failed=0, errors=(), sources=None, stopped=None) -> dict:
+    return {
+        "imported": imported,
+        "skipped": 0,
+        "failed": failed,
+        "errors": list(errors),
+        "sources": sources or {},
+        "stopped": stopped or {},
+    }
+
+
+def test_merge_stats():
+    merged = merge_stats(
+        [
+            stats(imported=2, sources={"blog": 3.0}),
+            stats(
+                imported=1,
+                failed=1,
+                errors=["x"],
+                sources={"blog": 5.0, "docs": None},
+                stopped={"blog": "deadline"},
+            ),
+        ]
+    )
+    assert (merged["imported"], merged["failed"], merged["errors"]) == (3, 1, ["x"])
+    assert merged["sources"] == {"blog": 5.0, "docs": None}
+    assert merged["stopped"] == {"blog": "deadline"}
@@ -0,0 +1,59 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from streaming import CHUNK_SIZE, DocumentTooLarge, read_body
+
+BODY = b"x" * (3 * CHUNK_SIZE)
+
+
+async def fixed(request):
+    return web.Response(body=BODY)
+
+
+async def chunked(request):
+    response = web.StreamResponse()
+    response.enable_chunked_encoding()
+    await response.prepare(request)
+    for start in range(0, len(BODY), CHUNK_SIZE):
+        await response.write(BODY[start : start + CHUNK_SIZE])
+    return response
+
+
+def read(path: str, max_bytes: int = None) -> tuple[bytearray, list]:
+    """@returns tuple[bytearray, list] - The body and the Content-Length of the response"""
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/fixed", fixed)
+        app.router.add_get("/chunked", chunked)
+        async with TestServer(app) as server, aiohttp.ClientSession() as session:
+            async with session.get(server.make_url(path)) as response:
+                return await read_body(response, max_bytes), response.content_length
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("path", ["/fixed", "/chunked"])
+def test_body_within_limit(path):
+    body, _ = read(path, len(BODY))
+    assert body == BODY
+
+
+def test_content_length_over_limit_is_rejected():
+    with pytest.raises(DocumentTooLarge):
+        read("/fixed", len(BODY) - 1)
+
+
+def test_chunked_body_is_cut_off():
+    with pytest.raises(DocumentTooLarge) as error:
+        read("/chunked", CHUNK_SIZE + 1)
+    assert error.value.max_bytes == CHUNK_SIZE + 1
+
+
+def test_chunked_body_has_no_content_length():
+    _, content_length = read("/chunked")
+    assert content_length is None
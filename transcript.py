@@ -71,27 +71,32 @@ def format_string(s):
     return s
 
 
-# Fetch transcripts for each video ID
-def fetch_transcripts(video_ids):
-    for snippet_tuple in video_ids:
-        video_id = snippet_tuple[0]
-        title = format_string(snippet_tuple[1])
-        description = snippet_tuple[2]
-        print(f"Downloading Transcript from {video_id}")
-        try:
-            transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
-            whole_text = description + " \n"
+def fetch_transcript(snippet_tuple):
+    video_id = snippet_tuple[0]
+    title = format_string(snippet_tuple[1])
+    description = snippet_tuple[2]
+    print(f"Downloading Transcript from {video_id}")
+    try:
+        transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
+        # Join once instead of growing the string entry by entry
+        whole_text = "".join(
+            [description, " \n"] + [entry["text"] + " " for entry in transcript_data]
+        )
+        del transcript_data
+
+        link = f"https://www.youtube.com/watch?v={video_id}"
 
-            for entry in transcript_data:
-                whole_text += entry["text"] + " "
+        return whole_text, title, link
 
-            link = f"https://www.youtube.com/watch?v={video_id}"
+    except:
+        print(f"Failed to fetch transcript for video ID: {video_id}")
+        return None, None, None
 
-            yield whole_text, title, link
 
-        except:
-            print(f"Failed to fetch transcript for video ID: {video_id}")
-            yield None, None, None
+# Fetch transcripts for each video ID
+def fetch_transcripts(video_ids):
+    for snippet_tuple in video_ids:
+        yield fetch_transcript(snippet_tuple)
 
 
 def fetch_youtube_transcripts():